@@ -3,7 +3,9 @@
 from __future__ import annotations
 
 import asyncio
-from typing import TypeAlias
+from datetime import timedelta
+import logging
+from typing import Any, TypeAlias
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
@@ -13,17 +15,87 @@ from homeassistant.const import (
     EVENT_HOMEASSISTANT_STOP,
     Platform,
 )
-from homeassistant.core import Event, HomeAssistant
+from homeassistant.core import CoreState, Event, HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util.hass_dict import HassKey
 from pyasyncialarm.pyasyncialarm import IAlarm
 
-from .const import DEFAULT_SEND_EVENTS
+from .connection import IAlarmConnection
+from .const import (
+    CONF_EVENT_COALESCE_WINDOW,
+    CONF_SCAN_INTERVAL_ACTIVE,
+    CONF_SCAN_INTERVAL_IDLE,
+    CONF_ZONE_SWEEP_CYCLES,
+    DEFAULT_EVENT_COALESCE_WINDOW,
+    DEFAULT_SCAN_INTERVAL_ACTIVE,
+    DEFAULT_SCAN_INTERVAL_IDLE,
+    DEFAULT_SEND_EVENTS,
+    DEFAULT_ZONE_SWEEP_CYCLES,
+    DOMAIN,
+    LOG_STORE_FILENAME,
+    LOG_STORE_RETENTION_DAYS,
+    LOG_SYNC_INTERVAL,
+    SETUP_TIMEOUT,
+    STARTUP_BUDGET,
+)
 from .coordinator import IAlarmCoordinator
+from .log_store import IAlarmLogStore
+from .scheduler import async_get_poll_scheduler
+from .snapshot_store import IAlarmSnapshotStore
+
+PLATFORMS = [
+    Platform.ALARM_CONTROL_PANEL,
+    Platform.BINARY_SENSOR,
+    Platform.BUTTON,
+    Platform.SENSOR,
+]
 
-PLATFORMS = [Platform.ALARM_CONTROL_PANEL, Platform.SENSOR, Platform.BUTTON]
+_LOGGER = logging.getLogger(__name__)
 
 IAlarmConfigEntry: TypeAlias = ConfigEntry[IAlarmCoordinator]
 
+DATA_STARTUP_DEADLINE: HassKey[float] = HassKey(f"{DOMAIN}_startup_deadline")
+
+
+@callback
+def _async_startup_deadline(hass: HomeAssistant) -> float | None:
+    """Return the loop time by which the panels set up at startup must answer.
+
+    The deadline is set by the first panel set up and shared by the others,
+    so startup does not take longer with more unreachable panels. None once
+    Home Assistant has started.
+    """
+    if hass.state not in (CoreState.not_running, CoreState.starting):
+        return None
+    if (deadline := hass.data.get(DATA_STARTUP_DEADLINE)) is None:
+        deadline = hass.data[DATA_STARTUP_DEADLINE] = hass.loop.time() + STARTUP_BUDGET
+    return deadline
+
+
+def _coordinator_options(config_entry: IAlarmConfigEntry) -> dict[str, Any]:
+    """Return the coordinator settings held in the entry options."""
+    options = config_entry.options
+    return {
+        # Read send_events from options, fallback to data for backwards
+        # compatibility.
+        "send_events": options.get(
+            CONF_EVENT, config_entry.data.get(CONF_EVENT, DEFAULT_SEND_EVENTS)
+        ),
+        "scan_interval_active": options.get(
+            CONF_SCAN_INTERVAL_ACTIVE, DEFAULT_SCAN_INTERVAL_ACTIVE
+        ),
+        "scan_interval_idle": options.get(
+            CONF_SCAN_INTERVAL_IDLE, DEFAULT_SCAN_INTERVAL_IDLE
+        ),
+        "zone_sweep_cycles": options.get(
+            CONF_ZONE_SWEEP_CYCLES, DEFAULT_ZONE_SWEEP_CYCLES
+        ),
+        "event_coalesce_window": options.get(
+            CONF_EVENT_COALESCE_WINDOW, DEFAULT_EVENT_COALESCE_WINDOW
+        ),
+    }
+
 
 async def async_setup_entry(
     hass: HomeAssistant, config_entry: IAlarmConfigEntry
@@ -31,24 +103,80 @@ async def async_setup_entry(
     """Set up iAlarm config."""
     host: str = config_entry.data[CONF_HOST]
     port: int = config_entry.data[CONF_PORT]
-
-    # Read send_events from options, fallback to data for backwards compatibility
-    send_events: bool = config_entry.options.get(
-        CONF_EVENT, config_entry.data.get(CONF_EVENT, DEFAULT_SEND_EVENTS)
-    )
     ialarm_device = IAlarm(host, port)
-
-    try:
-        async with asyncio.timeout(10):
-            mac = await ialarm_device.get_mac()
-    except (TimeoutError, ConnectionError) as ex:
-        raise ConfigEntryNotReady from ex
-
-    coordinator = IAlarmCoordinator(hass, ialarm_device, mac, send_events)
-
-    await coordinator.async_config_entry_first_refresh()
+    connection = IAlarmConnection(hass, ialarm_device)
+
+    # The MAC stored as unique id is trusted, the coordinator checks it
+    # against the panel once it answers. Only entries without one need the
+    # handshake.
+    mac_verified = False
+    mac: str
+    if config_entry.unique_id is not None:
+        mac = config_entry.unique_id
+    else:
+        try:
+            async with asyncio.timeout(SETUP_TIMEOUT):
+                mac = await connection.async_call(ialarm_device.get_mac)
+        except (TimeoutError, ConnectionError) as ex:
+            await connection.async_shutdown()
+            raise ConfigEntryNotReady from ex
+        mac_verified = True
+
+    scheduler = async_get_poll_scheduler(hass)
+    log_store = IAlarmLogStore(
+        hass, hass.config.path(LOG_STORE_FILENAME), mac, LOG_STORE_RETENTION_DAYS
+    )
+    await log_store.async_setup()
+    snapshot_store = IAlarmSnapshotStore(hass, mac)
+
+    coordinator = IAlarmCoordinator(
+        hass,
+        ialarm_device,
+        mac,
+        **_coordinator_options(config_entry),
+        log_store=log_store,
+        snapshot_store=snapshot_store,
+        connection=connection,
+        scheduler=scheduler,
+        mac_verified=mac_verified,
+    )
+    config_entry.async_on_unload(scheduler.async_register(coordinator))
+
+    # A panel with a stored snapshot starts from it and is polled in the
+    # background. Otherwise, while Home Assistant starts, all panels share
+    # one time budget: a panel missing it is set up unavailable and connects
+    # in the background.
+    if (snapshot := await snapshot_store.async_load()) is not None:
+        coordinator.async_restore(snapshot)
+        config_entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} {host} first refresh"
+        )
+    elif (startup_deadline := _async_startup_deadline(hass)) is None:
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except ConfigEntryNotReady:
+            await coordinator.async_shutdown()
+            raise
+    else:
+        try:
+            async with asyncio.timeout_at(startup_deadline):
+                await coordinator.async_refresh()
+        except TimeoutError as ex:
+            # Drop the poll still waiting on the panel, so the entities set up
+            # next do not wait for it either.
+            coordinator.single_flight.async_cancel_all()
+            coordinator.last_update_success = False
+            coordinator.last_exception = ex
+        if not coordinator.last_update_success:
+            _LOGGER.warning(
+                "iAlarm panel %s did not answer during startup, "
+                "it is set up unavailable and will connect in the background",
+                host,
+            )
+            connection.async_trip(coordinator.last_exception or TimeoutError())
 
     config_entry.runtime_data = coordinator
+    connection.async_start()
 
     async def _async_close_connection(event: Event) -> None:
         """Close connection on HA Stop."""
@@ -58,8 +186,18 @@ async def async_setup_entry(
         hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_close_connection)
     )
 
+    config_entry.async_on_unload(
+        async_track_time_interval(
+            hass,
+            coordinator.async_sync_log_if_dirty,
+            timedelta(seconds=LOG_SYNC_INTERVAL),
+        )
+    )
+
     config_entry.async_on_unload(config_entry.add_update_listener(update_listener))
 
+    # The entities start from the first refresh: none of them asks for its
+    # own update when added.
     await hass.config_entries.async_forward_entry_setups(config_entry, PLATFORMS)
 
     return True
@@ -73,5 +211,18 @@ async def async_unload_entry(
 
 
 async def update_listener(hass: HomeAssistant, config_entry: IAlarmConfigEntry) -> None:
-    """Handle options update."""
-    await hass.config_entries.async_reload(config_entry.entry_id)
+    """Handle options update.
+
+    Only a new panel address needs a reload. The other options are applied
+    to the running coordinator, and the alarm panel entity picks up the code
+    requirements itself, so the connection stays up.
+    """
+    coordinator = config_entry.runtime_data
+    device = coordinator.ialarm_device
+    if (config_entry.data[CONF_HOST], config_entry.data[CONF_PORT]) != (
+        device.host,
+        device.port,
+    ):
+        await hass.config_entries.async_reload(config_entry.entry_id)
+        return
+    coordinator.async_apply_options(**_coordinator_options(config_entry))
@@ -3,20 +3,29 @@
 from __future__ import annotations
 
 import logging
+from typing import Any
 
 from homeassistant.components import persistent_notification
 from homeassistant.components.alarm_control_panel import (
     AlarmControlPanelEntity,
     AlarmControlPanelEntityFeature,
+    AlarmControlPanelState,
     CodeFormat,
 )
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
 from homeassistant.helpers import entity_platform
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.util.json import JsonValueType
 
 from custom_components.ialarm_controller.entity import IAlarmEntity
 
 from . import IAlarmConfigEntry
+from .connection import IAlarmRequestPriority
 from .const import (
     CONF_REQUIRE_CODE_TO_ARM,
     CONF_REQUIRE_CODE_TO_DISARM,
@@ -49,7 +58,10 @@ async def async_setup_entry(
 
     for service_name, service_schema in ENTITY_SERVICES.items():
         platform.async_register_entity_service(
-            service_name, service_schema, f"async_{service_name}"
+            service_name,
+            service_schema,
+            f"async_{service_name}",
+            supports_response=SupportsResponse.OPTIONAL,
         )
 
 
@@ -74,7 +86,13 @@ class IAlarmPanel(IAlarmEntity, AlarmControlPanelEntity):
     ) -> None:
         """Create the entity with a DataUpdateCoordinator."""
         super().__init__(coordinator, unique_id, name)
+        self._config_entry = config_entry
+        self._apply_options()
+        self._update_alarm_state()
 
+    def _apply_options(self) -> None:
+        """Read the code requirements from the entry options."""
+        config_entry = self._config_entry
         self._require_code_to_arm = config_entry.options.get(
             CONF_REQUIRE_CODE_TO_ARM,
             config_entry.data.get(
@@ -95,16 +113,71 @@ class IAlarmPanel(IAlarmEntity, AlarmControlPanelEntity):
         else:
             self._attr_code_format = None
 
-        if coordinator.data:
-            self._attr_alarm_state = coordinator.data.get("ialarm_status")
+    def _update_alarm_state(self) -> None:
+        """Show the state set by a pending command, else the panel state."""
+        data = self.coordinator.data
+        if self.coordinator.pending_command_state is not None:
+            self._attr_alarm_state = self.coordinator.pending_command_state
+        elif data is not None:
+            self._attr_alarm_state = data.ialarm_status
+        self._attr_extra_state_attributes = {"stale": data is not None and data.stale}
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        if self.coordinator.data:
-            self._attr_alarm_state = self.coordinator.data.get("ialarm_status")
+        self._update_alarm_state()
         super()._handle_coordinator_update()
 
+    async def async_added_to_hass(self) -> None:
+        """Follow the option changes, which do not reload the entry."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._config_entry.add_update_listener(self._async_options_updated)
+        )
+
+    async def _async_options_updated(
+        self, hass: HomeAssistant, config_entry: IAlarmConfigEntry
+    ) -> None:
+        """Apply new code requirements."""
+        self._apply_options()
+        self.async_write_ha_state()
+
+    async def async_get_log(self, max_entries: int) -> ServiceResponse:
+        """Return the last log entries, served from the coordinator's buffer."""
+        return await self.coordinator.async_get_log(max_entries)
+
+    async def async_query_log(
+        self, limit: int, offset: int, **filters: Any
+    ) -> ServiceResponse:
+        """Return the stored log entries matching the filters."""
+        return await self.coordinator.async_query_log(
+            limit=limit, offset=offset, **filters
+        )
+
+    async def async_export_log(self, **filters: Any) -> ServiceResponse:
+        """Export the stored log entries matching the filters to a file."""
+        return await self.coordinator.async_export_log(**filters)
+
+    async def async_get_poll_schedule(self) -> ServiceResponse:
+        """Return the scheduled polls of all the iAlarm panels."""
+        if (scheduler := self.coordinator.scheduler) is None:
+            return {"polls": []}
+        polls: list[JsonValueType] = [
+            {
+                **poll,
+                "next_refresh": poll["next_refresh"].isoformat()
+                if poll["next_refresh"] is not None
+                else None,
+            }
+            for poll in scheduler.async_schedule()
+        ]
+        response: dict[str, JsonValueType] = {
+            "max_concurrent": scheduler.max_concurrent,
+            "polls_delayed": scheduler.polls_delayed,
+            "polls": polls,
+        }
+        return response
+
     async def async_alarm_disarm(self, code: str | None = None) -> None:
         """Send disarm command, then ensure any active alarm is cleared."""
         if self._require_code_to_disarm and (code is None or code == ""):
@@ -119,7 +192,13 @@ class IAlarmPanel(IAlarmEntity, AlarmControlPanelEntity):
             )
             return
 
-        cleared = await self.coordinator.ialarm_device.disarm_and_cancel()
+        await self.coordinator.async_run_command("disarm", self._async_disarm)
+
+    async def _async_disarm(self) -> None:
+        cleared = await self.coordinator.connection.async_call(
+            self.coordinator.ialarm_device.disarm_and_cancel,
+            priority=IAlarmRequestPriority.COMMAND,
+        )
 
         if not cleared:
             _LOGGER.warning(
@@ -127,12 +206,16 @@ class IAlarmPanel(IAlarmEntity, AlarmControlPanelEntity):
                 "state after all cancel attempts."
             )
 
+        await self.coordinator.async_refresh_after_command(
+            AlarmControlPanelState.DISARMED
+        )
+
         if self.coordinator.send_events:
             _LOGGER.debug("Event ialarm_disarm was triggered")
-            self.hass.bus.async_fire(
-                event_type="ialarm_disarm",
-                event_data={
-                    "device_id": self.entity_id,
+            self.coordinator.async_fire_event(
+                "ialarm_disarm",
+                {
+                    "entity_id": self.entity_id,
                     "type": "alarm_status",
                     "alarm_status": "DISARMED",
                 },
@@ -149,11 +232,20 @@ class IAlarmPanel(IAlarmEntity, AlarmControlPanelEntity):
                 notification_id=NOTIFICATION_ID,
             )
             return
-        await self.coordinator.ialarm_device.arm_stay()
+        await self.coordinator.async_run_command("arm_stay", self._async_arm_stay)
+
+    async def _async_arm_stay(self) -> None:
+        await self.coordinator.connection.async_call(
+            self.coordinator.ialarm_device.arm_stay,
+            priority=IAlarmRequestPriority.COMMAND,
+        )
+        await self.coordinator.async_refresh_after_command(
+            AlarmControlPanelState.ARMED_HOME
+        )
         if self.coordinator.send_events:
             _LOGGER.debug("Event ialarm_arm_stay was triggered")
-            self.hass.bus.async_fire(
-                event_type="ialarm_arm_stay", event_data={"alarm_status": "ARMED HOME"}
+            self.coordinator.async_fire_event(
+                "ialarm_arm_stay", {"alarm_status": "ARMED HOME"}
             )
 
     async def async_alarm_arm_away(self, code: str | None = None) -> None:
@@ -167,9 +259,18 @@ class IAlarmPanel(IAlarmEntity, AlarmControlPanelEntity):
                 notification_id=NOTIFICATION_ID,
             )
             return
-        await self.coordinator.ialarm_device.arm_away()
+        await self.coordinator.async_run_command("arm_away", self._async_arm_away)
+
+    async def _async_arm_away(self) -> None:
+        await self.coordinator.connection.async_call(
+            self.coordinator.ialarm_device.arm_away,
+            priority=IAlarmRequestPriority.COMMAND,
+        )
+        await self.coordinator.async_refresh_after_command(
+            AlarmControlPanelState.ARMED_AWAY
+        )
         if self.coordinator.send_events:
             _LOGGER.debug("Event ialarm_arm_away was triggered")
-            self.hass.bus.async_fire(
-                event_type="ialarm_arm_away", event_data={"alarm_status": "ARMED AWAY"}
+            self.coordinator.async_fire_event(
+                "ialarm_arm_away", {"alarm_status": "ARMED AWAY"}
             )
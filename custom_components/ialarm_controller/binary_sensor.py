@@ -0,0 +1,137 @@
+"""Support for iAlarm zone binary sensors."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+)
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from pyasyncialarm.const import StatusType
+
+from custom_components.ialarm_controller.entity import IAlarmEntity
+
+from . import IAlarmConfigEntry
+from .coordinator import IAlarmCoordinator
+
+ZONE_ATTRIBUTES = {
+    "alarm": StatusType.ZONE_ALARM,
+    "fault": StatusType.ZONE_FAULT,
+    "bypass": StatusType.ZONE_BYPASS,
+    "low_battery": StatusType.ZONE_LOW_BATTERY,
+    "loss": StatusType.ZONE_LOSS,
+}
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: IAlarmConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up one iAlarm binary sensor per zone in use."""
+    ialarm_coordinator = config_entry.runtime_data
+    if not (unique_id := config_entry.unique_id):
+        return
+
+    @callback
+    def _async_add_zones() -> bool:
+        """Add the zone entities, once the zone table is known."""
+        if (data := ialarm_coordinator.data) is None:
+            return False
+        async_add_entities(
+            (
+                IAlarmZoneBinarySensor(
+                    ialarm_coordinator, unique_id, config_entry.title, zone_id
+                )
+                for zone_id, _, zone_bits in data.zones()
+                if zone_bits
+            ),
+            False,
+        )
+        return True
+
+    if _async_add_zones():
+        return
+
+    # A panel set up while unreachable gets its zones on the first poll.
+    remove_listener: CALLBACK_TYPE | None = None
+
+    @callback
+    def _async_stop_listening() -> None:
+        nonlocal remove_listener
+        if remove_listener is not None:
+            remove_listener()
+            remove_listener = None
+
+    @callback
+    def _async_first_data() -> None:
+        if _async_add_zones():
+            _async_stop_listening()
+
+    remove_listener = ialarm_coordinator.async_add_listener(_async_first_data)
+    config_entry.async_on_unload(_async_stop_listening)
+
+
+class IAlarmZoneBinarySensor(IAlarmEntity, BinarySensorEntity):
+    """Alarm state of a single iAlarm zone.
+
+    The entity listens to its own zone only, so a change in one zone
+    writes one small state instead of the whole zone table.
+    """
+
+    _attr_device_class = BinarySensorDeviceClass.SAFETY
+
+    def __init__(
+        self,
+        coordinator: IAlarmCoordinator,
+        unique_id: str,
+        name: str,
+        zone_id: int,
+    ) -> None:
+        """Initialize the zone binary sensor."""
+        super().__init__(coordinator, unique_id, name)
+        self._zone_id = zone_id
+        self._attr_unique_id = f"{unique_id}_zone_{zone_id}"
+        self._update_from_zone()
+
+    @property
+    def available(self) -> bool:
+        """Return True if the zone is still reported by the panel."""
+        return (
+            super().available and self.coordinator.zone_state(self._zone_id) is not None
+        )
+
+    def _update_from_zone(self) -> None:
+        """Refresh the entity attributes from the zone state."""
+        zone_state = self.coordinator.zone_state(self._zone_id)
+        if zone_state is None:
+            return
+        zone_name, zone_bits = zone_state
+        self._attr_name = zone_name or f"Zone {self._zone_id}"
+        self._attr_is_on = bool(zone_bits & StatusType.ZONE_ALARM)
+        attributes: dict[str, Any] = {"zone_id": self._zone_id}
+        attributes.update(
+            (key, bool(zone_bits & flag)) for key, flag in ZONE_ATTRIBUTES.items()
+        )
+        self._attr_extra_state_attributes = attributes
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to the changes of this zone only."""
+        # Skip CoordinatorEntity's catch-all listener on purpose: the zone
+        # listener already fires on availability changes.
+        await super(CoordinatorEntity, self).async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_zone_listener(
+                self._zone_id, self._handle_coordinator_update
+            )
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle a change of this zone."""
+        self._update_from_zone()
+        self.async_write_ha_state()
@@ -78,7 +78,7 @@ async def async_setup_entry(
             IAlarmButton(coordinator, unique_id, config_entry.title, description)
             for description in BUTTONS
         ),
-        True,
+        False,
     )
 
 
@@ -15,13 +15,21 @@ from pyasyncialarm.pyasyncialarm import IAlarm
 import voluptuous as vol
 
 from .const import (
+    CONF_EVENT_COALESCE_WINDOW,
     CONF_REQUIRE_CODE_TO_ARM,
     CONF_REQUIRE_CODE_TO_DISARM,
+    CONF_SCAN_INTERVAL_ACTIVE,
+    CONF_SCAN_INTERVAL_IDLE,
+    CONF_ZONE_SWEEP_CYCLES,
+    DEFAULT_EVENT_COALESCE_WINDOW,
     DEFAULT_HOST,
     DEFAULT_PORT,
     DEFAULT_REQUIRE_CODE_TO_ARM,
     DEFAULT_REQUIRE_CODE_TO_DISARM,
+    DEFAULT_SCAN_INTERVAL_ACTIVE,
+    DEFAULT_SCAN_INTERVAL_IDLE,
     DEFAULT_SEND_EVENTS,
+    DEFAULT_ZONE_SWEEP_CYCLES,
     DOMAIN,
 )
 
@@ -136,6 +144,30 @@ class IAlarmOptionsFlow(OptionsFlow):
                     ),
                 ),
             ): bool,
+            vol.Required(
+                CONF_SCAN_INTERVAL_ACTIVE,
+                default=self.config_entry.options.get(
+                    CONF_SCAN_INTERVAL_ACTIVE, DEFAULT_SCAN_INTERVAL_ACTIVE
+                ),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0.5, max=300)),
+            vol.Required(
+                CONF_SCAN_INTERVAL_IDLE,
+                default=self.config_entry.options.get(
+                    CONF_SCAN_INTERVAL_IDLE, DEFAULT_SCAN_INTERVAL_IDLE
+                ),
+            ): vol.All(vol.Coerce(float), vol.Range(min=5, max=3600)),
+            vol.Required(
+                CONF_ZONE_SWEEP_CYCLES,
+                default=self.config_entry.options.get(
+                    CONF_ZONE_SWEEP_CYCLES, DEFAULT_ZONE_SWEEP_CYCLES
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=100)),
+            vol.Required(
+                CONF_EVENT_COALESCE_WINDOW,
+                default=self.config_entry.options.get(
+                    CONF_EVENT_COALESCE_WINDOW, DEFAULT_EVENT_COALESCE_WINDOW
+                ),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0, max=600)),
         }
 
         return self.async_show_form(
@@ -0,0 +1,634 @@
+"""Managed connection to an iAlarm panel.
+
+pyasyncialarm keeps a single TCP session per `IAlarm` and reopens it on
+demand, which means the first request after the panel dropped an idle
+session pays for the connect. `IAlarmConnection` sits in front of the
+device: every panel request goes through it, it keeps the session warm
+with heartbeats and it reconnects in the background with a jittered
+exponential backoff when the panel goes away.
+
+Every request has a timeout budget, and a circuit breaker opens after
+several requests failed in a row. While it is open, requests fail at
+once without touching the network; the background reconnect attempts are
+the half-open probes that close it again.
+
+The time the panel takes to answer is recorded per operation in
+fixed-bucket latency histograms, and the latest exchanges are kept in a
+small ring buffer that the diagnostics dump.
+"""
+
+from __future__ import annotations
+
+from array import array
+import asyncio
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from enum import IntEnum, StrEnum
+import heapq
+from itertools import count
+import logging
+import math
+import random
+import reprlib
+from time import monotonic, time
+from typing import Any, NamedTuple, TypeVar
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from homeassistant.util import dt as dt_util
+from pyasyncialarm.pyasyncialarm import IAlarm
+
+from .const import (
+    BREAKER_FAILURE_THRESHOLD,
+    EXCHANGE_CAPTURE_SIZE,
+    EXCHANGE_REPR_LIMIT,
+    KEEPALIVE_INTERVAL,
+    LATENCY_BUCKETS,
+    RECONNECT_BACKOFF_MAX,
+    RECONNECT_BACKOFF_MIN,
+    REQUEST_TIMEOUT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+class IAlarmConnectionState(StrEnum):
+    """State of the connection to the panel."""
+
+    CONNECTED = "connected"
+    CONNECTING = "connecting"
+    DISCONNECTED = "disconnected"
+
+
+class IAlarmBreakerState(StrEnum):
+    """State of the circuit breaker in front of the panel."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class IAlarmRequestPriority(IntEnum):
+    """Lane of a panel request, lower values are served first."""
+
+    COMMAND = 0
+    POLL = 1
+
+
+class IAlarmRequestAbandoned(Exception):  # noqa: N818
+    """A queued poll request was dropped in favour of a command."""
+
+
+class IAlarmRequestTimeout(ConnectionError):
+    """The panel did not answer a request within its timeout budget."""
+
+
+class IAlarmCircuitOpen(ConnectionError):
+    """The request was not sent, the circuit breaker is open."""
+
+
+@dataclass(slots=True)
+class IAlarmQueueStats:
+    """Time spent by the requests of one lane waiting for the panel.
+
+    Attributes:
+        requests: Number of requests that got the panel.
+        abandoned: Number of requests dropped while waiting.
+        last_wait: Queue wait of the latest request, in seconds.
+        max_wait: Longest queue wait seen, in seconds.
+        total_wait: Sum of the queue waits, in seconds.
+
+    """
+
+    requests: int = 0
+    abandoned: int = 0
+    last_wait: float = 0.0
+    max_wait: float = 0.0
+    total_wait: float = 0.0
+
+    @property
+    def mean_wait(self) -> float:
+        """Return the mean queue wait, in seconds."""
+        return self.total_wait / self.requests if self.requests else 0.0
+
+
+class IAlarmExchange(NamedTuple):
+    """A request sent to the panel and its outcome.
+
+    The arguments and the reply are kept as short representations, taken
+    when the exchange is captured, so the capture never holds on to whole
+    zone tables or log pages.
+    """
+
+    time: float
+    operation: str
+    args: str
+    elapsed: float
+    result: str
+    error: str | None
+
+
+# Bounded repr: large replies are abbreviated while they are formatted,
+# instead of being formatted whole and cut afterwards.
+_CAPTURE_REPR = reprlib.Repr(
+    maxlevel=4,
+    maxtuple=20,
+    maxlist=20,
+    maxdict=20,
+    maxstring=EXCHANGE_REPR_LIMIT,
+    maxother=EXCHANGE_REPR_LIMIT,
+)
+
+
+def _format_capture(value: Any) -> str:
+    """Return the representation of a captured value, cut to a sane length."""
+    text = _CAPTURE_REPR.repr(value)
+    if len(text) > EXCHANGE_REPR_LIMIT:
+        return f"{text[:EXCHANGE_REPR_LIMIT]}..."
+    return text
+
+
+@dataclass(slots=True)
+class IAlarmLatencyHistogram:
+    """Time taken by the panel to answer one operation, in milliseconds.
+
+    Requests are counted in the fixed LATENCY_BUCKETS, so recording one
+    allocates nothing; percentiles are estimated from the bucket bounds.
+
+    Attributes:
+        buckets: Requests per bucket, the last one for the slower requests.
+        calls: Number of requests answered or failed.
+        errors: Number of requests that failed or timed out.
+        total: Sum of the request times.
+        min: Fastest request time.
+        max: Slowest request time.
+
+    """
+
+    buckets: array[int] = field(
+        default_factory=lambda: array("L", [0]) * (len(LATENCY_BUCKETS) + 1)
+    )
+    calls: int = 0
+    errors: int = 0
+    total: float = 0.0
+    min: float = math.inf
+    max: float = 0.0
+
+    def record(self, elapsed: float, failed: bool = False) -> None:
+        """Count a request that took `elapsed` seconds."""
+        elapsed_ms = elapsed * 1000
+        self.buckets[bisect_left(LATENCY_BUCKETS, elapsed_ms)] += 1
+        self.calls += 1
+        self.errors += failed
+        self.total += elapsed_ms
+        self.min = min(self.min, elapsed_ms)
+        self.max = max(self.max, elapsed_ms)
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return the bucket bound below which `fraction` of the requests fall."""
+        if not self.calls:
+            return None
+        rank = math.ceil(fraction * self.calls)
+        seen = 0
+        for bound, requests in zip(LATENCY_BUCKETS, self.buckets, strict=False):
+            seen += requests
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histogram and its summary, for diagnostics."""
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "min_ms": round(self.min, 1) if self.calls else None,
+            "max_ms": round(self.max, 1),
+            "mean_ms": round(self.total / self.calls, 1) if self.calls else None,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets": {
+                **{
+                    f"le_{bound}": requests
+                    for bound, requests in zip(
+                        LATENCY_BUCKETS, self.buckets, strict=False
+                    )
+                },
+                "slower": self.buckets[-1],
+            },
+        }
+
+
+class IAlarmConnection:
+    """Long-lived connection to one panel, shared by all its requests.
+
+    The panel answers one request at a time. Requests wait for it in two
+    lanes: commands are always served before queued polls, and a command
+    drops the queued poll requests marked as abandonable, since the
+    refresh that follows a command reads the new state anyway.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        device: IAlarm,
+        *,
+        keepalive_interval: float = KEEPALIVE_INTERVAL,
+        backoff_min: float = RECONNECT_BACKOFF_MIN,
+        backoff_max: float = RECONNECT_BACKOFF_MAX,
+        request_timeout: float = REQUEST_TIMEOUT,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+    ) -> None:
+        """Initialize the connection."""
+        self.hass = hass
+        self.device = device
+        self.keepalive_interval = keepalive_interval
+        self.backoff_min = backoff_min
+        self.backoff_max = backoff_max
+        self.request_timeout = request_timeout
+        self.failure_threshold = failure_threshold
+        self.state = IAlarmConnectionState.DISCONNECTED
+        self.last_error: str | None = None
+        self.reconnect_attempts = 0
+        self.breaker_state = IAlarmBreakerState.CLOSED
+        self.consecutive_failures = 0
+        self.requests_rejected = 0
+        self._last_activity = 0.0
+        # Monotonic time of the next scheduled poll, set by the coordinator. A
+        # poll due within the keepalive interval keeps the session open.
+        self.next_poll_at: float | None = None
+        self._listeners: list[CALLBACK_TYPE] = []
+        self._unsub_keepalive: CALLBACK_TYPE | None = None
+        self._cancel_reconnect: CALLBACK_TYPE | None = None
+        self._stopped = False
+        self._busy = False
+        self._waiters: list[tuple[int, int, asyncio.Future[None], bool]] = []
+        self._sequence = count()
+        self.commands_issued = 0
+        # Requests that got the panel, heartbeats and probes included.
+        self.round_trips = 0
+        self.latency: dict[str, IAlarmLatencyHistogram] = {}
+        self.exchanges: deque[IAlarmExchange] = deque(maxlen=EXCHANGE_CAPTURE_SIZE)
+        self.queue_stats = {
+            priority: IAlarmQueueStats() for priority in IAlarmRequestPriority
+        }
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for connection and circuit breaker state changes."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def _async_set_state(self, state: IAlarmConnectionState) -> None:
+        if state == self.state:
+            return
+        _LOGGER.debug("Connection to %s is %s", self.device.host, state)
+        self.state = state
+        self._async_notify()
+
+    @callback
+    def _async_set_breaker_state(self, state: IAlarmBreakerState) -> None:
+        if state == self.breaker_state:
+            return
+        if state == IAlarmBreakerState.OPEN:
+            _LOGGER.warning(
+                "Circuit breaker for %s opened after %s failed requests: %s",
+                self.device.host,
+                self.consecutive_failures,
+                self.last_error,
+            )
+        elif state == IAlarmBreakerState.CLOSED:
+            _LOGGER.info("Circuit breaker for %s closed", self.device.host)
+        self.breaker_state = state
+        self._async_notify()
+
+    @callback
+    def _async_notify(self) -> None:
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    async def _async_acquire(
+        self, priority: IAlarmRequestPriority, abandonable: bool
+    ) -> None:
+        """Wait for the panel in the lane of the request."""
+        stats = self.queue_stats[priority]
+        if priority == IAlarmRequestPriority.COMMAND:
+            self.commands_issued += 1
+            self._async_abandon_polls()
+        if not self._busy and not self._waiters:
+            self._busy = True
+            stats.requests += 1
+            stats.last_wait = 0.0
+            return
+
+        queued_at = monotonic()
+        waiter: asyncio.Future[None] = self.hass.loop.create_future()
+        entry = (priority, next(self._sequence), waiter, abandonable)
+        heapq.heappush(self._waiters, entry)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if not waiter.done() or waiter.cancelled():
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+            elif waiter.exception() is None:
+                # The panel was handed over just before the cancellation.
+                self._async_release()
+            else:
+                # Abandoned for a command just before the cancellation: the
+                # panel was never handed over, so there is nothing to release.
+                stats.abandoned += 1
+            raise
+        except IAlarmRequestAbandoned:
+            stats.abandoned += 1
+            raise
+
+        wait = monotonic() - queued_at
+        stats.requests += 1
+        stats.last_wait = wait
+        stats.max_wait = max(stats.max_wait, wait)
+        stats.total_wait += wait
+        if priority == IAlarmRequestPriority.COMMAND:
+            _LOGGER.debug("Command waited %.3f s for the panel", wait)
+
+    @callback
+    def _async_abandon_polls(self) -> None:
+        """Drop the queued poll requests that can be abandoned."""
+        kept = []
+        for entry in self._waiters:
+            if entry[3]:
+                entry[2].set_exception(IAlarmRequestAbandoned())
+            else:
+                kept.append(entry)
+        if len(kept) != len(self._waiters):
+            heapq.heapify(kept)
+            self._waiters = kept
+
+    @callback
+    def _async_release(self) -> None:
+        """Hand the panel over to the next queued request."""
+        while self._waiters:
+            waiter = heapq.heappop(self._waiters)[2]
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._busy = False
+
+    async def async_call(
+        self,
+        method: Callable[..., Awaitable[_T]],
+        *args: Any,
+        priority: IAlarmRequestPriority = IAlarmRequestPriority.POLL,
+        abandonable: bool = False,
+        timeout: float | None = None,
+    ) -> _T:
+        """Send a request to the panel through the managed connection.
+
+        `timeout` overrides the default budget of the request, in seconds.
+        Raises IAlarmRequestAbandoned when an abandonable request is dropped
+        for a command while it waits, IAlarmCircuitOpen without sending
+        anything while the circuit breaker is open and IAlarmRequestTimeout
+        when the panel does not answer in time.
+        """
+        result, _ = await self.async_call_timed(
+            method,
+            *args,
+            priority=priority,
+            abandonable=abandonable,
+            timeout=timeout,
+        )
+        return result
+
+    async def async_call_timed(
+        self,
+        method: Callable[..., Awaitable[_T]],
+        *args: Any,
+        priority: IAlarmRequestPriority = IAlarmRequestPriority.POLL,
+        abandonable: bool = False,
+        timeout: float | None = None,
+    ) -> tuple[_T, float]:
+        """Send a request like async_call, also returning its round-trip time.
+
+        The round-trip time, in seconds, is the exchange with the panel
+        alone, without the time spent waiting for it in the queue.
+        """
+        if self.breaker_state != IAlarmBreakerState.CLOSED:
+            self.requests_rejected += 1
+            raise IAlarmCircuitOpen(
+                f"Circuit breaker for {self.device.host} is open: {self.last_error}"
+            )
+        return await self._async_request(method, args, priority, abandonable, timeout)
+
+    async def _async_request(
+        self,
+        method: Callable[..., Awaitable[_T]],
+        args: tuple[Any, ...],
+        priority: IAlarmRequestPriority = IAlarmRequestPriority.POLL,
+        abandonable: bool = False,
+        timeout: float | None = None,
+    ) -> tuple[_T, float]:
+        """Send a request, bypassing the circuit breaker."""
+        if timeout is None:
+            timeout = self.request_timeout
+        await self._async_acquire(priority, abandonable)
+        self.round_trips += 1
+        operation = getattr(method, "__name__", "request")
+        started_at = time()
+        started = monotonic()
+        try:
+            try:
+                async with asyncio.timeout(timeout):
+                    result = await method(*args)
+            except BaseException as error:
+                self._async_record_exchange(
+                    operation, args, started_at, started, error=error
+                )
+                raise
+            elapsed = self._async_record_exchange(
+                operation, args, started_at, started, result=result
+            )
+        except TimeoutError as error:
+            # The session may still hold part of the late reply: close it, so
+            # the next request starts over on a fresh connection.
+            await self.device.shutdown()
+            lost = IAlarmRequestTimeout(f"No reply within {timeout} s")
+            self._async_connection_lost(lost)
+            raise lost from error
+        except asyncio.CancelledError:
+            # Likewise for a request cancelled half-way, e.g. by a poll budget.
+            await self.device.shutdown()
+            raise
+        except ConnectionError as error:
+            self._async_connection_lost(error)
+            raise
+        finally:
+            self._async_release()
+        self._async_connection_ok()
+        return result, elapsed
+
+    @callback
+    def _async_record_exchange(
+        self,
+        operation: str,
+        args: tuple[Any, ...],
+        started_at: float,
+        started: float,
+        *,
+        result: Any = None,
+        error: BaseException | None = None,
+    ) -> float:
+        """Time a panel exchange, keep it in the capture buffer and return its time."""
+        elapsed = monotonic() - started
+        if not isinstance(error, asyncio.CancelledError):
+            if (histogram := self.latency.get(operation)) is None:
+                histogram = self.latency[operation] = IAlarmLatencyHistogram()
+            histogram.record(elapsed, failed=error is not None)
+        self.exchanges.append(
+            IAlarmExchange(
+                started_at,
+                operation,
+                _format_capture(args),
+                elapsed,
+                _format_capture(result),
+                None if error is None else repr(error),
+            )
+        )
+        return elapsed
+
+    @callback
+    def async_dump_exchanges(self) -> list[dict[str, Any]]:
+        """Return the captured exchanges, oldest first."""
+        return [
+            {
+                "time": dt_util.utc_from_timestamp(exchange.time).isoformat(),
+                "operation": exchange.operation,
+                "args": exchange.args,
+                "elapsed_ms": round(exchange.elapsed * 1000, 1),
+                "result": exchange.result,
+                "error": exchange.error,
+            }
+            for exchange in self.exchanges
+        ]
+
+    @callback
+    def _async_connection_ok(self) -> None:
+        self._last_activity = monotonic()
+        self.reconnect_attempts = 0
+        self.consecutive_failures = 0
+        if self._cancel_reconnect is not None:
+            self._cancel_reconnect()
+            self._cancel_reconnect = None
+        self._async_set_state(IAlarmConnectionState.CONNECTED)
+        self._async_set_breaker_state(IAlarmBreakerState.CLOSED)
+
+    @callback
+    def _async_connection_lost(self, error: Exception) -> None:
+        self.last_error = str(error) or type(error).__name__
+        self.consecutive_failures += 1
+        self._async_set_state(IAlarmConnectionState.DISCONNECTED)
+        if (
+            self.breaker_state == IAlarmBreakerState.HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            self._async_set_breaker_state(IAlarmBreakerState.OPEN)
+        if self._cancel_reconnect is not None or self._stopped:
+            return
+        delay = min(self.backoff_max, self.backoff_min * 2**self.reconnect_attempts)
+        # Jitter keeps several panels, or HA instances, from retrying in step.
+        delay *= random.uniform(0.5, 1)  # noqa: S311
+        self.reconnect_attempts += 1
+        _LOGGER.debug(
+            "Reconnecting to %s in %.1f s (attempt %s): %s",
+            self.device.host,
+            delay,
+            self.reconnect_attempts,
+            self.last_error,
+        )
+        self._cancel_reconnect = async_call_later(
+            self.hass, delay, self._async_reconnect
+        )
+
+    @callback
+    def async_record_failure(self, error: Exception) -> None:
+        """Count a request cut short by the caller's own budget as failed.
+
+        The session was already closed when the request was cancelled; this
+        also lets a panel that keeps hanging open the circuit breaker.
+        """
+        self._async_connection_lost(error)
+
+    @callback
+    def async_trip(self, error: Exception) -> None:
+        """Open the circuit breaker for a panel known to be unreachable.
+
+        Requests then fail at once until a background reconnect attempt
+        gets an answer from the panel.
+        """
+        self._async_connection_lost(error)
+        self._async_set_breaker_state(IAlarmBreakerState.OPEN)
+
+    async def _async_reconnect(self, _now: datetime) -> None:
+        self._cancel_reconnect = None
+        if self.breaker_state == IAlarmBreakerState.OPEN:
+            # This reconnect attempt is the probe that may close the breaker.
+            self._async_set_breaker_state(IAlarmBreakerState.HALF_OPEN)
+        self._async_set_state(IAlarmConnectionState.CONNECTING)
+        await self._async_heartbeat()
+
+    async def _async_heartbeat(self) -> None:
+        # The library reopens a closed session under its own lock, so a cheap
+        # request is both the heartbeat and a safe reconnect.
+        try:
+            await self._async_request(self.device.get_mac, ())
+        except ConnectionError:
+            return
+
+    async def _async_keepalive(self, _now: datetime) -> None:
+        now = monotonic()
+        if (
+            self.state != IAlarmConnectionState.CONNECTED
+            or now - self._last_activity < self.keepalive_interval
+        ):
+            return
+        if (
+            self.next_poll_at is not None
+            and now <= self.next_poll_at <= now + self.keepalive_interval
+        ):
+            # The scheduled poll comes soon enough to keep the session open.
+            return
+        await self._async_heartbeat()
+
+    @callback
+    def async_start(self) -> None:
+        """Start sending heartbeats while the connection is idle."""
+        self._stopped = False
+        self._unsub_keepalive = async_track_time_interval(
+            self.hass,
+            self._async_keepalive,
+            timedelta(seconds=self.keepalive_interval),
+            cancel_on_shutdown=True,
+        )
+
+    async def async_shutdown(self) -> None:
+        """Stop heartbeats and reconnects and close the panel session."""
+        self._stopped = True
+        if self._unsub_keepalive is not None:
+            self._unsub_keepalive()
+            self._unsub_keepalive = None
+        if self._cancel_reconnect is not None:
+            self._cancel_reconnect()
+            self._cancel_reconnect = None
+        await self.device.shutdown()
+        self._async_set_state(IAlarmConnectionState.DISCONNECTED)
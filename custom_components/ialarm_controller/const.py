@@ -1,10 +1,17 @@
 """Constants for the iAlarm integration."""
 
-from typing import TypedDict
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Iterator
+from functools import cache, reduce
+from operator import or_
+from sys import intern
+from typing import Any
 
 from homeassistant.components.alarm_control_panel import AlarmControlPanelState
 from homeassistant.helpers import config_validation as cv
-from pyasyncialarm.const import ZoneStatusType
+from pyasyncialarm.const import StatusType, ZoneStatusType
 from pyasyncialarm.pyasyncialarm import IAlarm
 import voluptuous as vol
 
@@ -19,6 +26,52 @@ CONF_REQUIRE_CODE_TO_DISARM = "require_code_to_disarm"
 DEFAULT_REQUIRE_CODE_TO_ARM = True
 DEFAULT_REQUIRE_CODE_TO_DISARM = True
 
+CONF_SCAN_INTERVAL_ACTIVE = "scan_interval_active"
+CONF_SCAN_INTERVAL_IDLE = "scan_interval_idle"
+DEFAULT_SCAN_INTERVAL_ACTIVE = 5
+DEFAULT_SCAN_INTERVAL_IDLE = 60
+CONF_ZONE_SWEEP_CYCLES = "zone_sweep_cycles"
+# Read the full zone table at least every N polls even if the status is unchanged.
+DEFAULT_ZONE_SWEEP_CYCLES = 5
+CONF_EVENT_COALESCE_WINDOW = "event_coalesce_window"
+# Seconds during which zones joining an ongoing alarm are batched into one event.
+DEFAULT_EVENT_COALESCE_WINDOW = 10
+# Seconds of fast polling after a command was sent to the panel.
+COMMAND_FAST_POLL_WINDOW = 30
+# Polls, and seconds between them, spent confirming the state set by a command.
+COMMAND_CONFIRM_POLLS = 5
+COMMAND_CONFIRM_INTERVAL = 1
+# Seconds during which a repeated command is collapsed into the previous one.
+COMMAND_DEBOUNCE_WINDOW = 2
+
+# Seconds of silence after which a heartbeat keeps the panel session open.
+KEEPALIVE_INTERVAL = 30
+# Bounds, in seconds, of the exponential backoff between reconnect attempts.
+RECONNECT_BACKOFF_MIN = 1
+RECONNECT_BACKOFF_MAX = 300
+# Seconds a panel request may take; the paginated zone table and log reads
+# get a larger budget, and a whole poll cycle has its own.
+REQUEST_TIMEOUT = 15
+LIST_REQUEST_TIMEOUT = 30
+POLL_TIMEOUT = 60
+# Consecutive failed requests that open the circuit breaker.
+BREAKER_FAILURE_THRESHOLD = 5
+# Seconds the first contact with a panel may take when it is set up, and the
+# budget shared by all the panels set up while Home Assistant starts.
+SETUP_TIMEOUT = 10
+STARTUP_BUDGET = 20
+# Scheduled polls, across all panels, allowed to run at the same time.
+MAX_CONCURRENT_POLLS = 4
+# Upper bounds, in milliseconds, of the panel request latency histogram
+# buckets. Slower requests land in a last, open-ended bucket.
+LATENCY_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+# Latest polls the poll success rate of the link quality sensors covers.
+LINK_QUALITY_WINDOW = 20
+# Latest panel exchanges kept for diagnostics, and the length their
+# arguments and replies are cut to when captured.
+EXCHANGE_CAPTURE_SIZE = 50
+EXCHANGE_REPR_LIMIT = 500
+
 DOMAIN = "ialarm_controller"
 
 NOTIFICATION_ID = "ialarm_notification"
@@ -32,25 +85,215 @@ IALARM_TO_HASS = {
     IAlarm.TRIGGERED: AlarmControlPanelState.TRIGGERED,
 }
 
+# Panel states that are polled with the active (fast) scan interval.
+ACTIVE_ALARM_STATES = {
+    AlarmControlPanelState.ARMED_AWAY,
+    AlarmControlPanelState.ARMED_HOME,
+    AlarmControlPanelState.TRIGGERED,
+}
+
 
 SERVICE_GET_LOG = "get_log"
 SERVICE_GET_LOG_MAX_ENTRIES = 25
+# Entries kept in the local log ring buffer, matches the get_log service cap.
+LOG_CACHE_SIZE = 100
+# Seconds the local log buffer is trusted when the panel state did not change.
+LOG_CACHE_MAX_AGE = 300
+# Seconds between background log syncs into the persistent log store. A sync
+# only happens when the panel state changed since the previous one.
+LOG_SYNC_INTERVAL = 900
+LOG_STORE_FILENAME = "ialarm_controller_log.db"
+LOG_STORE_RETENTION_DAYS = 365
+# Seconds a changed panel snapshot waits before being written to storage, so
+# a burst of changes costs a single write.
+SNAPSHOT_SAVE_DELAY = 30
+# Failed polls a restored snapshot is shown for, before the entities turn
+# unavailable until the panel answers.
+STALE_MAX_FAILED_POLLS = 3
 
 GET_LOG_ACTION_SCHEMA = cv.make_entity_service_schema(
     {vol.Required("max_entries"): vol.Coerce(int)}
 )
 
+SERVICE_QUERY_LOG = "query_log"
+SERVICE_QUERY_LOG_MAX_ENTRIES = 1000
+
+LOG_FILTERS_SCHEMA = {
+    vol.Optional("start_time"): cv.datetime,
+    vol.Optional("end_time"): cv.datetime,
+    vol.Optional("area"): vol.Coerce(int),
+    vol.Optional("event"): cv.string,
+    vol.Optional("name"): cv.string,
+}
+
+QUERY_LOG_ACTION_SCHEMA = cv.make_entity_service_schema(
+    {
+        **LOG_FILTERS_SCHEMA,
+        vol.Optional("limit", default=100): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=SERVICE_QUERY_LOG_MAX_ENTRIES)
+        ),
+        vol.Optional("offset", default=0): vol.All(vol.Coerce(int), vol.Range(min=0)),
+    }
+)
+
+SERVICE_EXPORT_LOG = "export_log"
+# Entries read from the log store and written to the export file at a time.
+LOG_EXPORT_CHUNK_SIZE = 500
+LOG_EXPORT_FILENAME = "ialarm_controller_log_{panel}_{timestamp}.csv"
+
+EXPORT_LOG_ACTION_SCHEMA = cv.make_entity_service_schema(LOG_FILTERS_SCHEMA)
+
+SERVICE_GET_POLL_SCHEDULE = "get_poll_schedule"
+
+GET_POLL_SCHEDULE_ACTION_SCHEMA = cv.make_entity_service_schema({})
+
 ENTITY_SERVICES = {
     SERVICE_GET_LOG: GET_LOG_ACTION_SCHEMA,
+    SERVICE_QUERY_LOG: QUERY_LOG_ACTION_SCHEMA,
+    SERVICE_EXPORT_LOG: EXPORT_LOG_ACTION_SCHEMA,
+    SERVICE_GET_POLL_SCHEDULE: GET_POLL_SCHEDULE_ACTION_SCHEMA,
 }
 
 
-class IAlarmStatusType(TypedDict):
-    """Represents the status of the iAlarm.
+# Zone status bits that are reported as an anomaly by the zone status sensor.
+ZONE_ANOMALY_MASK = (
+    StatusType.ZONE_BYPASS
+    | StatusType.ZONE_FAULT
+    | StatusType.ZONE_LOW_BATTERY
+    | StatusType.ZONE_LOSS
+)
+
+
+@cache
+def zone_status_names(zone_bits: int) -> str:
+    """Return the comma separated StatusType names set in a zone bitmask."""
+    if not zone_bits:
+        return StatusType.ZONE_NOT_USED.name
+    return ", ".join(
+        status_type.name for status_type in StatusType if status_type & zone_bits
+    )
+
+
+class IAlarmStatusSnapshot:
+    """Immutable snapshot of the iAlarm state, shared by all entities.
+
+    Zones are stored column-wise: `zone_ids` and `zone_bits` are compact
+    arrays holding the zone number and the StatusType bitmask of each zone,
+    `zone_names` holds the interned zone names in the same order.
 
     - ialarm_status: The current status of the alarm, can be a string or None.
-    - zone_status_list: List of zone statuses, each element is of type ZoneStatusType.
+    - stale: True for a snapshot restored from storage at startup, until a
+      poll confirms the panel state.
     """
 
-    ialarm_status: str | None
-    zone_status_list: list[ZoneStatusType]
+    __slots__ = (
+        "_hash",
+        "_index",
+        "ialarm_status",
+        "stale",
+        "zone_bits",
+        "zone_ids",
+        "zone_names",
+    )
+
+    _hash: int
+    _index: dict[int, int]
+    ialarm_status: AlarmControlPanelState | None
+    zone_ids: array[int]
+    zone_names: tuple[str | None, ...]
+    zone_bits: array[int]
+    stale: bool
+
+    def __init__(
+        self,
+        ialarm_status: AlarmControlPanelState | None,
+        zone_ids: Iterable[int] = (),
+        zone_names: Iterable[str | None] = (),
+        zone_bits: Iterable[int] = (),
+        *,
+        stale: bool = False,
+    ) -> None:
+        """Initialize the snapshot."""
+        ids = array("H", zone_ids)
+        names = tuple(intern(name) if name else None for name in zone_names)
+        bits = array("B", zone_bits)
+        set_slot = object.__setattr__
+        set_slot(self, "ialarm_status", ialarm_status)
+        set_slot(self, "zone_ids", ids)
+        set_slot(self, "zone_names", names)
+        set_slot(self, "zone_bits", bits)
+        set_slot(self, "stale", stale)
+        set_slot(self, "_index", {zone_id: pos for pos, zone_id in enumerate(ids)})
+        set_slot(
+            self,
+            "_hash",
+            hash((ialarm_status, ids.tobytes(), bits.tobytes(), names, stale)),
+        )
+
+    @classmethod
+    def from_zone_status(
+        cls,
+        ialarm_status: AlarmControlPanelState | None,
+        zone_status_list: Iterable[ZoneStatusType],
+    ) -> IAlarmStatusSnapshot:
+        """Build a snapshot from the zone list returned by pyasyncialarm."""
+        zones = [
+            (zone_id, zone.get("name"), reduce(or_, zone.get("types") or (), 0))
+            for zone in zone_status_list
+            if (zone_id := zone.get("zone_id"))
+        ]
+        return cls(
+            ialarm_status,
+            (zone[0] for zone in zones),
+            (zone[1] for zone in zones),
+            (zone[2] for zone in zones),
+        )
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Refuse changes, the snapshot is shared by all entities."""
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __hash__(self) -> int:
+        """Return the fingerprint of the snapshot."""
+        return self._hash
+
+    def __eq__(self, other: object) -> bool:
+        """Compare two snapshots field by field."""
+        if not isinstance(other, IAlarmStatusSnapshot):
+            return NotImplemented
+        return (
+            self._hash == other._hash
+            and self.ialarm_status == other.ialarm_status
+            and self.zone_ids == other.zone_ids
+            and self.zone_bits == other.zone_bits
+            and self.zone_names == other.zone_names
+            and self.stale == other.stale
+        )
+
+    def __len__(self) -> int:
+        """Return the number of zones."""
+        return len(self.zone_ids)
+
+    def __repr__(self) -> str:
+        """Return a short representation for logs."""
+        return f"<{type(self).__name__} {self.ialarm_status} zones={len(self)}>"
+
+    def zone(self, zone_id: int) -> tuple[str | None, int] | None:
+        """Return the name and status bitmask of a zone, if it is known."""
+        if (pos := self._index.get(zone_id)) is None:
+            return None
+        return self.zone_names[pos], self.zone_bits[pos]
+
+    def zones(self) -> Iterator[tuple[int, str | None, int]]:
+        """Iterate over (zone id, name, status bitmask) for every zone."""
+        return zip(self.zone_ids, self.zone_names, self.zone_bits, strict=True)
+
+    @property
+    def has_alarm(self) -> bool:
+        """Return True if any zone is in alarm."""
+        return any(bits & StatusType.ZONE_ALARM for bits in self.zone_bits)
+
+    @property
+    def has_anomaly(self) -> bool:
+        """Return True if any zone reports a bypass, fault, low battery or loss."""
+        return any(bits & ZONE_ANOMALY_MASK for bits in self.zone_bits)
@@ -2,21 +2,251 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable, Coroutine, Hashable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from functools import partial
+from itertools import islice
 import logging
+from time import monotonic
+from typing import Any, TypeVar
 
 from homeassistant.components.alarm_control_panel import AlarmControlPanelState
-from homeassistant.core import HomeAssistant, ServiceResponse
-from homeassistant.helpers.entity_component import DEFAULT_SCAN_INTERVAL
+from homeassistant.const import CONF_DEVICE_ID
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, ServiceResponse, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import device_registry as dr, issue_registry as ir
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util, slugify
+from homeassistant.util.json import JsonValueType
 from pyasyncialarm.const import AlarmStatusType, LogEntryType, ZoneStatusType
 from pyasyncialarm.pyasyncialarm import IAlarm
 
-from .const import DOMAIN, IALARM_TO_HASS, SERVICE_GET_LOG_MAX_ENTRIES, IAlarmStatusType
+from .connection import (
+    IAlarmBreakerState,
+    IAlarmConnection,
+    IAlarmRequestAbandoned,
+    IAlarmRequestPriority,
+    IAlarmRequestTimeout,
+)
+from .const import (
+    ACTIVE_ALARM_STATES,
+    COMMAND_CONFIRM_INTERVAL,
+    COMMAND_CONFIRM_POLLS,
+    COMMAND_DEBOUNCE_WINDOW,
+    COMMAND_FAST_POLL_WINDOW,
+    DEFAULT_EVENT_COALESCE_WINDOW,
+    DEFAULT_SCAN_INTERVAL_ACTIVE,
+    DEFAULT_SCAN_INTERVAL_IDLE,
+    DEFAULT_ZONE_SWEEP_CYCLES,
+    DOMAIN,
+    IALARM_TO_HASS,
+    LINK_QUALITY_WINDOW,
+    LIST_REQUEST_TIMEOUT,
+    LOG_CACHE_MAX_AGE,
+    LOG_CACHE_SIZE,
+    LOG_EXPORT_CHUNK_SIZE,
+    LOG_EXPORT_FILENAME,
+    POLL_TIMEOUT,
+    SERVICE_GET_LOG_MAX_ENTRIES,
+    STALE_MAX_FAILED_POLLS,
+    IAlarmStatusSnapshot,
+)
+from .log_store import IAlarmLogStore, log_entry_key
+from .scheduler import IAlarmPollScheduler
+from .snapshot_store import IAlarmSnapshotStore
 
 _LOGGER = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
 
-class IAlarmCoordinator(DataUpdateCoordinator[IAlarmStatusType]):
+# Raw panel states in which the alarm is derived from the zone alarm bits, so
+# the zone table has to be read on every poll.
+ZONE_DEPENDENT_STATUSES = {IAlarm.ARMED_AWAY, IAlarm.ARMED_STAY, IAlarm.TRIGGERED}
+
+
+@dataclass(slots=True)
+class IAlarmPollStats:
+    """Counters describing the panel traffic generated by polling.
+
+    Attributes:
+        polls: Number of polling cycles run.
+        status_fetches: Number of status requests sent to the panel.
+        zone_fetches: Number of full zone table transfers.
+        zone_fetches_skipped: Cycles answered without a zone table transfer.
+        zone_records_skipped: Zone table rows not transferred thanks to the
+            skipped fetches (each fetch reads a name row and a status row).
+        updates_published: Polls whose snapshot differed and woke the listeners.
+        updates_skipped: Polls whose snapshot was unchanged, so no listener
+            was woken.
+        polls_abandoned: Polls dropped because a command was sent meanwhile.
+
+    """
+
+    polls: int = 0
+    status_fetches: int = 0
+    zone_fetches: int = 0
+    zone_fetches_skipped: int = 0
+    zone_records_skipped: int = 0
+    updates_published: int = 0
+    updates_skipped: int = 0
+    polls_abandoned: int = 0
+
+    @property
+    def skip_ratio(self) -> float:
+        """Return the share of successful polls that skipped the listener fan-out."""
+        total = self.updates_published + self.updates_skipped
+        return self.updates_skipped / total if total else 0.0
+
+
+@dataclass(slots=True)
+class IAlarmLinkQuality:
+    """Quality of the link to the panel, updated from the poll results.
+
+    The round-trip time and jitter are smoothed like RTP does (RFC 3550):
+    each status request moves the round-trip time 1/8 and the jitter 1/16
+    of the way to the new sample.
+
+    Attributes:
+        rtt: Smoothed round-trip time of the status request, in milliseconds.
+        jitter: Smoothed difference between consecutive round trips, in
+            milliseconds.
+        outcomes: Whether each of the latest polls succeeded, oldest first.
+        successes: Number of successful polls in `outcomes`.
+        last_success: Time of the latest successful poll.
+
+    """
+
+    rtt: float | None = None
+    jitter: float | None = None
+    outcomes: deque[bool] = field(
+        default_factory=lambda: deque(maxlen=LINK_QUALITY_WINDOW)
+    )
+    successes: int = 0
+    last_success: datetime | None = None
+    _last_rtt: float = 0.0
+
+    def record_rtt(self, elapsed: float) -> None:
+        """Add a round trip that took `elapsed` seconds."""
+        rtt = elapsed * 1000
+        if self.rtt is None or self.jitter is None:
+            self.rtt = rtt
+            self.jitter = 0.0
+        else:
+            self.jitter += (abs(rtt - self._last_rtt) - self.jitter) / 16
+            self.rtt += (rtt - self.rtt) / 8
+        self._last_rtt = rtt
+
+    def record_poll(self, success: bool) -> None:
+        """Add the outcome of a poll to the sliding window."""
+        outcomes = self.outcomes
+        if len(outcomes) == outcomes.maxlen:
+            self.successes -= outcomes[0]
+        outcomes.append(success)
+        self.successes += success
+        if success:
+            self.last_success = dt_util.utcnow()
+
+    @property
+    def success_rate(self) -> float | None:
+        """Return the share of the latest polls that succeeded, in percent."""
+        if not self.outcomes:
+            return None
+        return round(100 * self.successes / len(self.outcomes), 1)
+
+
+class IAlarmSingleFlight:
+    """Run identical concurrent calls once and share their result.
+
+    A call whose key is already in flight awaits the running call instead of
+    sending its own requests to the panel. With a hold time, the result of a
+    successful call is also handed to the identical calls made within that
+    many seconds after it finished.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the single-flight group."""
+        self.hass = hass
+        self.coalesced = 0
+        self._calls: dict[Hashable, tuple[asyncio.Task[Any], float]] = {}
+        self._finished_at: dict[Hashable, float] = {}
+
+    def _reusable(self, key: Hashable) -> asyncio.Task[Any] | None:
+        """Return the call of the key if it can still be shared."""
+        if (call := self._calls.get(key)) is None:
+            return None
+        task, hold = call
+        if not task.done():
+            return task
+        # The done callback may not have run yet, the call then just finished.
+        finished_at = self._finished_at.get(key, monotonic())
+        if (
+            not task.cancelled()
+            and task.exception() is None
+            and monotonic() - finished_at < hold
+        ):
+            return task
+        return None
+
+    async def async_run(
+        self,
+        key: Hashable,
+        job: Callable[[], Coroutine[Any, Any, _T]],
+        hold: float = 0.0,
+    ) -> _T:
+        """Run the job, or share the result of the identical call in flight."""
+        if (task := self._reusable(key)) is not None:
+            self.coalesced += 1
+        else:
+            task = self.hass.async_create_task(job(), f"{DOMAIN} {key}")
+            self._calls[key] = (task, hold)
+            task.add_done_callback(partial(self._async_finished, key))
+        # Shielded, so a caller giving up does not cancel the others' call.
+        return await asyncio.shield(task)
+
+    @callback
+    def _async_finished(self, key: Hashable, task: asyncio.Task[Any]) -> None:
+        """Record the end of a call, dropping it unless it is held."""
+        if not task.cancelled():
+            # Mark the exception as retrieved, every caller re-raises it.
+            task.exception()
+        call = self._calls.get(key)
+        if call is None or call[0] is not task:
+            return
+        if call[1] > 0:
+            self._finished_at[key] = monotonic()
+        else:
+            del self._calls[key]
+
+    @callback
+    def async_cancel_all(self) -> None:
+        """Cancel the calls still in flight."""
+        for task, _ in self._calls.values():
+            task.cancel()
+
+    @callback
+    def async_forget(self, key: Hashable) -> None:
+        """Stop handing out the held result of a finished call."""
+        call = self._calls.get(key)
+        if call is not None and call[0].done():
+            del self._calls[key]
+            self._finished_at.pop(key, None)
+
+
+# DataUpdateCoordinator internals the poll scheduler hooks into, see
+# IAlarmCoordinator._async_replace_refresh_timer.
+_BASE_REFRESH_INTERNALS = (
+    "_update_interval_seconds",
+    "_unsub_refresh",
+    "_async_unsub_refresh",
+    "_handle_refresh_interval",
+)
+
+
+class IAlarmCoordinator(DataUpdateCoordinator[IAlarmStatusSnapshot]):
     """Class to manage fetching iAlarm data."""
 
     def __init__(
@@ -25,31 +255,580 @@ class IAlarmCoordinator(DataUpdateCoordinator[IAlarmStatusType]):
         device: IAlarm,
         mac: str,
         send_events: bool,
+        *,
+        scan_interval_active: float = DEFAULT_SCAN_INTERVAL_ACTIVE,
+        scan_interval_idle: float = DEFAULT_SCAN_INTERVAL_IDLE,
+        zone_sweep_cycles: int = DEFAULT_ZONE_SWEEP_CYCLES,
+        event_coalesce_window: float = DEFAULT_EVENT_COALESCE_WINDOW,
+        log_store: IAlarmLogStore | None = None,
+        snapshot_store: IAlarmSnapshotStore | None = None,
+        connection: IAlarmConnection | None = None,
+        scheduler: IAlarmPollScheduler | None = None,
+        mac_verified: bool = False,
     ) -> None:
         """Initialize global iAlarm data updater."""
         self.ialarm_device = device
-        self.state: IAlarmStatusType | None = None
+        self.connection = connection or IAlarmConnection(hass, device)
+        self.scheduler = scheduler
+        self.state: IAlarmStatusSnapshot | None = None
         self.host: str = device.host
         self.mac = mac
+        # The MAC comes from the config entry, it is checked on the first poll.
+        self.mac_verified = mac_verified
+        self._verify_mac_task: asyncio.Task[None] | None = None
         self.send_events = send_events
+        self.scan_interval_active = timedelta(seconds=scan_interval_active)
+        self.scan_interval_idle = timedelta(seconds=scan_interval_idle)
+        self._fast_poll_until: float = 0.0
+        # State set by the latest command, shown until the panel confirms it.
+        self.pending_command_state: AlarmControlPanelState | None = None
+        self.command_confirm_interval: float = COMMAND_CONFIRM_INTERVAL
+        self._confirm_task: asyncio.Task[None] | None = None
+        self.single_flight = IAlarmSingleFlight(hass)
+        self._last_command: Hashable | None = None
+        self.zone_sweep_cycles = zone_sweep_cycles
+        self.poll_stats = IAlarmPollStats()
+        self.link_quality = IAlarmLinkQuality()
+        self._link_listeners: list[CALLBACK_TYPE] = []
+        self._stale_failed_polls = 0
+        # Zone table and status fetches of the setup refresh, taken when that
+        # first poll ends, whether it ran in the setup or in the background.
+        self.startup_fetches: dict[str, int] | None = None
+        self._zone_cache: list[ZoneStatusType] | None = None
+        self._last_status_value: int | None = None
+        self._cycles_since_zone_fetch = 0
+        self._cycle_commands = 0
+        self._zone_listeners: dict[int, list[CALLBACK_TYPE]] = {}
+        self._zone_snapshot = IAlarmStatusSnapshot(None)
+        self._zones_available = False
+        self._log_cache: deque[LogEntryType] = deque(maxlen=LOG_CACHE_SIZE)
+        self._log_synced_at: float | None = None
+        self._log_dirty = True
+        self.log_store = log_store
+        self.snapshot_store = snapshot_store
+        self.event_coalesce_window = event_coalesce_window
+        # Zones already announced in the ongoing alarm, None while not triggered.
+        self._announced_zone_ids: set[int] | None = None
+        self._pending_alarmed_zones: list[ZoneStatusType] = []
+        self._cancel_alarm_event: CALLBACK_TYPE | None = None
+        self._device_id: str | None = None
 
+        # Poll fast until the first state tells us which cadence fits.
+        # Listeners are only woken when the returned snapshot object changes,
+        # see _async_update_data.
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=DEFAULT_SCAN_INTERVAL,
+            update_interval=self.scan_interval_active,
+            always_update=False,
+        )
+        self._breaker_state = self.connection.breaker_state
+        self.connection.async_add_listener(self._async_connection_changed)
+
+    @property
+    def device_id(self) -> str | None:
+        """Return the device registry id of the panel, once it is registered."""
+        if self._device_id is None and self.mac:
+            device = dr.async_get(self.hass).async_get_device(
+                identifiers={(DOMAIN, self.mac)}
+            )
+            if device is not None:
+                self._device_id = device.id
+        return self._device_id
+
+    @callback
+    def async_fire_event(
+        self, event_type: str, event_data: dict[str, Any] | None = None
+    ) -> None:
+        """Fire a panel event tagged with the device id of the panel.
+
+        The device id lets the device triggers route the event to the
+        automations of this panel only.
+        """
+        self.hass.bus.async_fire(
+            event_type, {**(event_data or {}), CONF_DEVICE_ID: self.device_id}
+        )
+
+    @callback
+    def async_add_zone_listener(
+        self, zone_id: int, update_callback: CALLBACK_TYPE
+    ) -> CALLBACK_TYPE:
+        """Listen for changes of a single zone.
+
+        The callback fires only when the status of that zone (or the
+        availability of the coordinator) changes. Returns a function that
+        removes the listener.
+        """
+        listeners = self._zone_listeners.setdefault(zone_id, [])
+        listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            listeners.remove(update_callback)
+            if not listeners:
+                self._zone_listeners.pop(zone_id, None)
+
+        return remove_listener
+
+    @callback
+    def async_restore(self, snapshot: IAlarmStatusSnapshot) -> None:
+        """Start from a stored snapshot until the panel answers.
+
+        The snapshot is flagged as stale: the first poll replaces it even
+        when the panel state did not change, so listeners see it confirmed.
+        """
+        self.data = self.state = snapshot
+        self._stale_failed_polls = 0
+        self.update_interval = self._next_update_interval(snapshot.ialarm_status)
+
+    @callback
+    def async_apply_options(
+        self,
+        *,
+        send_events: bool,
+        scan_interval_active: float,
+        scan_interval_idle: float,
+        zone_sweep_cycles: int,
+        event_coalesce_window: float,
+    ) -> None:
+        """Apply new options without restarting the coordinator.
+
+        A new polling cadence takes effect right away: the next refresh is
+        rescheduled on it.
+        """
+        self.send_events = send_events
+        self.scan_interval_active = timedelta(seconds=scan_interval_active)
+        self.scan_interval_idle = timedelta(seconds=scan_interval_idle)
+        self.zone_sweep_cycles = zone_sweep_cycles
+        self.event_coalesce_window = event_coalesce_window
+
+        update_interval = self._next_update_interval(
+            self.data.ialarm_status if self.data is not None else None
         )
+        if update_interval != self.update_interval:
+            self.update_interval = update_interval
+            if self._listeners:
+                self._schedule_refresh()
+
+    @callback
+    def async_add_link_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for link quality changes, i.e. for every poll outcome.
+
+        Unlike the coordinator listeners, these also fire when a poll
+        returned the same snapshot.
+        """
+        self._link_listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._link_listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def _async_record_poll(self, success: bool) -> None:
+        self.link_quality.record_poll(success)
+        for update_callback in list(self._link_listeners):
+            update_callback()
+        if success or self.data is None or not self.data.stale:
+            return
+        self._stale_failed_polls += 1
+        if self._stale_failed_polls == STALE_MAX_FAILED_POLLS:
+            # The base class only notifies the first of consecutive failures.
+            self.async_update_listeners()
+
+    @property
+    def shows_restored_state(self) -> bool:
+        """Return True while a restored snapshot stands in for the panel.
+
+        It does for STALE_MAX_FAILED_POLLS failed polls at most.
+        """
+        return (
+            self.data is not None
+            and self.data.stale
+            and self._stale_failed_polls < STALE_MAX_FAILED_POLLS
+        )
+
+    def zone_state(self, zone_id: int) -> tuple[str | None, int] | None:
+        """Return the name and status bitmask of a zone, if it is known."""
+        return self.data.zone(zone_id) if self.data else None
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all registered listeners, then those of the changed zones."""
+        super().async_update_listeners()
+
+        previous = self._zone_snapshot
+        current = self.data or IAlarmStatusSnapshot(None)
+        zone_ids = {*previous.zone_ids, *current.zone_ids}
+        if self.last_update_success != self._zones_available:
+            changed = zone_ids
+        elif current.zone_ids == previous.zone_ids:
+            # Same zone layout: compare the status bits and names column-wise.
+            changed = {
+                zone_id
+                for zone_id, old_bits, new_bits, old_name, new_name in zip(
+                    current.zone_ids,
+                    previous.zone_bits,
+                    current.zone_bits,
+                    previous.zone_names,
+                    current.zone_names,
+                    strict=True,
+                )
+                if old_bits != new_bits or old_name is not new_name
+            }
+        else:
+            changed = {
+                zone_id
+                for zone_id in zone_ids
+                if previous.zone(zone_id) != current.zone(zone_id)
+            }
+        self._zone_snapshot = current
+        self._zones_available = self.last_update_success
+
+        for zone_id in changed:
+            for update_callback in list(self._zone_listeners.get(zone_id, ())):
+                update_callback()
+
+    async def async_refresh_after_command(
+        self, expected_state: AlarmControlPanelState | None = None
+    ) -> None:
+        """Poll fast for a while so the panel's reaction to a command shows up.
+
+        With an expected state, the state is shown optimistically right away
+        and a short burst of polls confirms it; see _async_confirm_command.
+        """
+        self._fast_poll_until = monotonic() + COMMAND_FAST_POLL_WINDOW
+        self.update_interval = self.scan_interval_active
+        self._log_dirty = True
+        if expected_state is None:
+            await self.async_request_refresh()
+            return
+
+        if self._confirm_task is not None:
+            self._confirm_task.cancel()
+        self.pending_command_state = expected_state
+        self.async_update_listeners()
+        self._confirm_task = self.hass.async_create_background_task(
+            self._async_confirm_command(expected_state),
+            f"{DOMAIN} {self.host} confirm {expected_state}",
+        )
+
+    async def _async_confirm_command(
+        self, expected_state: AlarmControlPanelState
+    ) -> None:
+        """Poll until the panel reports the expected state, or roll back."""
+        try:
+            for attempt in range(COMMAND_CONFIRM_POLLS):
+                if attempt:
+                    await asyncio.sleep(self.command_confirm_interval)
+                await self.async_refresh()
+                if self.data is not None and self.data.ialarm_status == expected_state:
+                    _LOGGER.debug("Panel confirmed %s", expected_state)
+                    return
+
+            actual_state = self.data.ialarm_status if self.data is not None else None
+            _LOGGER.warning(
+                "iAlarm did not confirm %s after the command, it reports %s",
+                expected_state,
+                actual_state,
+            )
+            if self.send_events:
+                self.async_fire_event(
+                    "ialarm_command_failed",
+                    {"expected_state": expected_state, "alarm_status": actual_state},
+                )
+        finally:
+            if self._confirm_task is asyncio.current_task():
+                self._confirm_task = None
+                self.pending_command_state = None
+                self.async_update_listeners()
+
+    def _next_update_interval(
+        self, alarm_status: AlarmControlPanelState | None
+    ) -> timedelta:
+        """Pick the polling cadence that fits the current panel state."""
+        if alarm_status in ACTIVE_ALARM_STATES or monotonic() < self._fast_poll_until:
+            return self.scan_interval_active
+        return self.scan_interval_idle
+
+    @callback
+    def _async_track_alarmed_zones(
+        self, alarm_status: str | None, alarmed_zones: list[ZoneStatusType] | None
+    ) -> None:
+        """Announce a trigger once, then only the zones joining the alarm.
+
+        The transition to TRIGGERED is announced right away. Zones joining
+        the ongoing alarm are batched for `event_coalesce_window` seconds
+        into a single `ialarm_triggered` event carrying only those zones.
+        """
+        if alarm_status != AlarmControlPanelState.TRIGGERED:
+            if self._announced_zone_ids is not None:
+                self._async_flush_alarm_event()
+                self._announced_zone_ids = None
+            return
+
+        current_zones = {zone["zone_id"]: zone for zone in alarmed_zones or ()}
+        if self._announced_zone_ids is None:
+            self._announced_zone_ids = set(current_zones)
+            self._async_fire_triggered(list(current_zones.values()))
+            return
+
+        # A zone that left the alarm is announced again if it comes back.
+        self._announced_zone_ids &= current_zones.keys()
+        new_zones = [
+            zone
+            for zone_id, zone in current_zones.items()
+            if zone_id not in self._announced_zone_ids
+        ]
+        if not new_zones:
+            return
+        self._announced_zone_ids.update(zone["zone_id"] for zone in new_zones)
+        self._pending_alarmed_zones.extend(new_zones)
+        if self.event_coalesce_window <= 0:
+            self._async_flush_alarm_event()
+        elif self._cancel_alarm_event is None:
+            self._cancel_alarm_event = async_call_later(
+                self.hass, self.event_coalesce_window, self._async_flush_alarm_event
+            )
+
+    @callback
+    def _async_flush_alarm_event(self, _now: datetime | None = None) -> None:
+        """Fire the batched zones joining the alarm, if any."""
+        if self._cancel_alarm_event is not None:
+            self._cancel_alarm_event()
+            self._cancel_alarm_event = None
+        if self._pending_alarmed_zones:
+            self._async_fire_triggered(self._pending_alarmed_zones)
+            self._pending_alarmed_zones = []
+
+    @callback
+    def _async_fire_triggered(self, alarmed_zones: list[ZoneStatusType]) -> None:
+        """Fire an `ialarm_triggered` event."""
+        _LOGGER.debug(
+            "iAlarm in TRIGGERED status with allarmed zones [%s]", alarmed_zones
+        )
+        self.async_fire_event(
+            "ialarm_triggered",
+            {
+                "alarm_status": "TRIGGERED",
+                "alarmed_zones": alarmed_zones,
+            },
+        )
+
+    @callback
+    def _async_connection_changed(self) -> None:
+        """Refresh as soon as a probe closes the circuit breaker again."""
+        was_closed = self._breaker_state == IAlarmBreakerState.CLOSED
+        self._breaker_state = self.connection.breaker_state
+        if not was_closed and self._breaker_state == IAlarmBreakerState.CLOSED:
+            self.hass.async_create_background_task(
+                self.async_refresh(), f"{DOMAIN} {self.host} recovered"
+            )
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        """Schedule the next refresh on the phase grid of the poll scheduler."""
+        if (
+            self.scheduler is None
+            or (self.config_entry and self.config_entry.pref_disable_polling)
+            or not self._async_replace_refresh_timer(self.scheduler)
+        ):
+            self.connection.next_poll_at = None
+            super()._schedule_refresh()
+
+    @callback
+    def _async_replace_refresh_timer(self, scheduler: IAlarmPollScheduler) -> bool:
+        """Take over the refresh timer of DataUpdateCoordinator.
+
+        The base class has no hook to choose when the next refresh runs, so
+        this is the one place relying on its internals, listed in
+        _BASE_REFRESH_INTERNALS and checked by the tests: the polling interval
+        in _update_interval_seconds, the pending timer cancelled by
+        _async_unsub_refresh and held in _unsub_refresh, and
+        _handle_refresh_interval, which runs a scheduled refresh.
+
+        Return False, leaving the timer alone, when there is no interval.
+        """
+        if (interval := self._update_interval_seconds) is None:
+            return False
+        self._async_unsub_refresh()
+        next_refresh = scheduler.async_next_refresh(self, interval)
+        self.connection.next_poll_at = (
+            monotonic() + next_refresh - self.hass.loop.time()
+        )
+        self._unsub_refresh = self.hass.loop.call_at(
+            next_refresh,
+            self._async_start_scheduled_refresh,
+            scheduler,
+            self._handle_refresh_interval,
+        ).cancel
+        return True
+
+    @callback
+    def _async_start_scheduled_refresh(
+        self,
+        scheduler: IAlarmPollScheduler,
+        handle_refresh: Callable[[], Coroutine[Any, Any, None]],
+    ) -> None:
+        refresh = self._async_scheduled_refresh(scheduler, handle_refresh)
+        name = f"{self.name} - {self.host} - refresh"
+        if self.config_entry:
+            self.config_entry.async_create_background_task(
+                self.hass, refresh, name, eager_start=True
+            )
+        else:
+            self.hass.async_create_background_task(refresh, name, eager_start=True)
+
+    async def _async_scheduled_refresh(
+        self,
+        scheduler: IAlarmPollScheduler,
+        handle_refresh: Callable[[], Coroutine[Any, Any, None]],
+    ) -> None:
+        """Run a scheduled refresh within the global poll concurrency limit."""
+        async with scheduler.async_poll_slot():
+            await handle_refresh()
 
     async def async_shutdown(self) -> None:
         """Shut down the coordinator and close the alarm device connection."""
-        await self.ialarm_device.shutdown()
+        self._async_flush_alarm_event()
+        if self._confirm_task is not None:
+            self._confirm_task.cancel()
+        if self._verify_mac_task is not None:
+            self._verify_mac_task.cancel()
+        self.single_flight.async_cancel_all()
+        await self.connection.async_shutdown()
         await super().async_shutdown()
 
+    async def async_run_command(
+        self, name: str, job: Callable[[], Coroutine[Any, Any, _T]]
+    ) -> _T:
+        """Run a panel command, collapsing repeats of it.
+
+        The same command already running, or finished less than
+        COMMAND_DEBOUNCE_WINDOW seconds ago with no other command since, is
+        not sent again: the caller gets the result of the previous one.
+        A panel that cannot be reached, the circuit breaker open included,
+        is reported to the caller as a HomeAssistantError.
+        """
+        key = ("command", name)
+        if key != self._last_command:
+            if self._last_command is not None:
+                self.single_flight.async_forget(self._last_command)
+            self._last_command = key
+        try:
+            return await self.single_flight.async_run(key, job, COMMAND_DEBOUNCE_WINDOW)
+        except ConnectionError as error:
+            raise HomeAssistantError(
+                translation_domain=DOMAIN,
+                translation_key="command_failed",
+                translation_placeholders={"command": name, "error": str(error)},
+            ) from error
+
     async def async_cancel_alarm(self) -> None:
         """Cancel alarm alerts."""
-        await self.ialarm_device.cancel_alarm()
+        await self.async_run_command("cancel_alarm", self._async_cancel_alarm)
+
+    async def _async_cancel_alarm(self) -> None:
+        await self.connection.async_call(
+            self.ialarm_device.cancel_alarm, priority=IAlarmRequestPriority.COMMAND
+        )
+        await self.async_refresh_after_command()
         if self.send_events:
-            self.hass.bus.async_fire(event_type="cancel_alarm")
+            self.async_fire_event("cancel_alarm")
+
+    async def async_sync_log(self) -> list[LogEntryType]:
+        """Fetch the panel log and keep the entries newer than the cursor.
+
+        The cursor is the newest entry already in the local ring buffer, or
+        in the log store after a restart. Every entry above it is written to
+        the store and announced with an `ialarm_logs` event, while the ring
+        buffer keeps only the newest LOG_CACHE_SIZE entries. Concurrent syncs
+        share a single panel fetch.
+        """
+        return await self.single_flight.async_run("sync_log", self._async_sync_log)
+
+    async def _async_sync_log(self) -> list[LogEntryType]:
+        # The panel sends its whole log in one reply, newest first.
+        items: list[LogEntryType] = await self.connection.async_call(
+            self.ialarm_device.get_log, timeout=LIST_REQUEST_TIMEOUT
+        )
+        entries = [item for item in items if item is not None]
+        cursor: tuple[Any, ...] | None
+        if self._log_cache:
+            cursor = log_entry_key(self._log_cache[0])
+        elif self.log_store:
+            cursor = await self.log_store.async_newest_key()
+        else:
+            cursor = None
+        new_items: list[LogEntryType] = []
+        for item in entries:
+            if log_entry_key(item) == cursor:
+                break
+            new_items.append(item)
+
+        if self._log_cache:
+            self._log_cache.extendleft(reversed(new_items))
+        else:
+            self._log_cache.extend(islice(entries, LOG_CACHE_SIZE))
+        self._log_synced_at = monotonic()
+        self._log_dirty = False
+        _LOGGER.debug("Log sync found %s new entries.", len(new_items))
+
+        if new_items:
+            if self.log_store:
+                await self.log_store.async_add_entries(reversed(new_items))
+            self.hass.bus.async_fire(event_type="ialarm_logs", event_data=new_items)
+        return new_items
+
+    async def async_sync_log_if_dirty(self, _now: datetime | None = None) -> None:
+        """Sync the log in the background if the panel state changed meanwhile."""
+        if not self._log_dirty:
+            return
+        try:
+            await self.async_sync_log()
+        except ConnectionError as error:
+            _LOGGER.debug("Background log sync failed: %s", error)
+
+    async def async_query_log(
+        self, *, limit: int, offset: int, **filters: Any
+    ) -> ServiceResponse:
+        """Query the persistent log store, paginated with limit and offset."""
+        if self.log_store is None:
+            return {"items": [], "next_offset": None}
+        items: list[JsonValueType] = list(
+            await self.log_store.async_query(limit=limit, offset=offset, **filters)
+        )
+        return {
+            "items": items,
+            "next_offset": offset + len(items) if len(items) == limit else None,
+        }
+
+    async def async_export_log(self, **filters: Any) -> ServiceResponse:
+        """Export the stored log entries matching the filters to a CSV file.
+
+        The panel is read once to bring the store up to date, then the file
+        is written from the store in chunks without holding the connection.
+        """
+        if self.log_store is None:
+            raise HomeAssistantError("The log store is not available")
+        try:
+            await self.async_sync_log()
+        except ConnectionError as error:
+            _LOGGER.warning("Exporting stored log entries only: %s", error)
+
+        path = self.hass.config.path(
+            LOG_EXPORT_FILENAME.format(
+                panel=slugify(self.mac),
+                timestamp=dt_util.now().strftime("%Y%m%d%H%M%S"),
+            )
+        )
+        entries = await self.log_store.async_export_csv(
+            path, LOG_EXPORT_CHUNK_SIZE, **filters
+        )
+        _LOGGER.debug("Exported %s log entries to %s.", entries, path)
+        return {"path": path, "entries": entries}
 
     async def async_get_log(
         self, max_entries: int = SERVICE_GET_LOG_MAX_ENTRIES
@@ -57,72 +836,232 @@ class IAlarmCoordinator(DataUpdateCoordinator[IAlarmStatusType]):
         """Retrieve last n log entries."""
         _LOGGER.debug("Retrieve last %s log entries.", max_entries)
 
-        items: list[LogEntryType] = await self.ialarm_device.get_last_log_entries(
-            max_entries
-        )
-
-        if items:
-            self.hass.bus.async_fire(event_type="ialarm_logs", event_data=items)
-            return {
-                "items": [
-                    {
-                        "time": item["time"],
-                        "area": item["area"],
-                        "event": item["event"],
-                        "name": item["name"],
-                    }
-                    for item in items
-                    if item is not None
-                ],
-            }
-        return {"items": []}
+        # The local buffer is trusted until the panel state changes, a command
+        # is sent or it gets too old.
+        if (
+            self._log_dirty
+            or self._log_synced_at is None
+            or monotonic() - self._log_synced_at > LOG_CACHE_MAX_AGE
+        ):
+            try:
+                await self.async_sync_log()
+            except ConnectionError as error:
+                raise HomeAssistantError(
+                    translation_domain=DOMAIN,
+                    translation_key="log_sync_failed",
+                    translation_placeholders={"error": str(error)},
+                ) from error
 
-    async def _async_update_data(self) -> IAlarmStatusType:
-        """Fetch data from iAlarm."""
-        try:
-            zone_status: list[
-                ZoneStatusType
-            ] = await self.ialarm_device.get_zone_status()
-            internal_alarm_status: AlarmStatusType = (
-                await self.ialarm_device.get_status(zone_status)
+        return {
+            "items": [
+                {
+                    "time": item["time"],
+                    "area": item["area"],
+                    "event": item["event"],
+                    "name": item["name"],
+                }
+                for item in islice(self._log_cache, max_entries)
+            ],
+        }
+
+    def _zone_fetch_due(self) -> bool:
+        """Tell whether this cycle has to read the full zone table."""
+        return (
+            self._zone_cache is None
+            or self._last_status_value in ZONE_DEPENDENT_STATUSES
+            or self._cycles_since_zone_fetch + 1 >= self.zone_sweep_cycles
+        )
+
+    async def _async_poll_request(
+        self,
+        method: Callable[..., Awaitable[_T]],
+        *args: Any,
+        timeout: float | None = None,
+    ) -> _T:
+        """Send a request of the polling cycle.
+
+        A command sent since the cycle began makes the rest of the cycle
+        moot: the refresh requested by the command reads the new state.
+        """
+        result, _ = await self._async_timed_poll_request(method, *args, timeout=timeout)
+        return result
+
+    async def _async_timed_poll_request(
+        self,
+        method: Callable[..., Awaitable[_T]],
+        *args: Any,
+        timeout: float | None = None,
+    ) -> tuple[_T, float]:
+        """Send a request of the polling cycle, also returning its round-trip time."""
+        if self.connection.commands_issued != self._cycle_commands:
+            raise IAlarmRequestAbandoned
+        return await self.connection.async_call_timed(
+            method, *args, abandonable=True, timeout=timeout
+        )
+
+    async def _async_fetch_zones(self) -> list[ZoneStatusType]:
+        """Read the full zone table from the panel."""
+        zone_status: list[ZoneStatusType] = await self._async_poll_request(
+            self.ialarm_device.get_zone_status, timeout=LIST_REQUEST_TIMEOUT
+        )
+        self.poll_stats.zone_fetches += 1
+        self._zone_cache = zone_status
+        self._cycles_since_zone_fetch = 0
+        return zone_status
+
+    async def _async_fetch_status(
+        self, zone_status: list[ZoneStatusType]
+    ) -> AlarmStatusType:
+        """Read the alarm status from the panel."""
+        internal_alarm_status: AlarmStatusType
+        internal_alarm_status, elapsed = await self._async_timed_poll_request(
+            self.ialarm_device.get_status, zone_status
+        )
+        self.link_quality.record_rtt(elapsed)
+        self.poll_stats.status_fetches += 1
+        return internal_alarm_status
+
+    async def _async_fetch_panel_state(
+        self,
+    ) -> tuple[list[ZoneStatusType], AlarmStatusType]:
+        """Poll the panel, reading the zone table only when it may have changed.
+
+        The cheap status request runs on every cycle. The zone table is read
+        when nothing is cached yet, while the panel is armed (the alarm is
+        derived from the zone bits), every `zone_sweep_cycles` cycles as a
+        safety sweep, and whenever the status differs from the previous one.
+        """
+        self.poll_stats.polls += 1
+
+        if self._zone_fetch_due():
+            zone_status = await self._async_fetch_zones()
+            return zone_status, await self._async_fetch_status(zone_status)
+
+        zone_status = self._zone_cache or []
+        internal_alarm_status = await self._async_fetch_status(zone_status)
+        if internal_alarm_status["status_value"] != self._last_status_value:
+            zone_status = await self._async_fetch_zones()
+            return zone_status, await self._async_fetch_status(zone_status)
+
+        self._cycles_since_zone_fetch += 1
+        self.poll_stats.zone_fetches_skipped += 1
+        self.poll_stats.zone_records_skipped += 2 * len(zone_status)
+        return zone_status, internal_alarm_status
+
+    async def _async_update_data(self) -> IAlarmStatusSnapshot:
+        """Fetch data from iAlarm.
+
+        Overlapping refreshes share a single poll, unless a command was sent
+        after the running poll started.
+        """
+        snapshot = await self.single_flight.async_run(
+            ("poll", self.connection.commands_issued), self._async_poll
+        )
+        if not self.mac_verified and (
+            self._verify_mac_task is None or self._verify_mac_task.done()
+        ):
+            self._verify_mac_task = self.hass.async_create_background_task(
+                self._async_verify_mac(), f"{DOMAIN} {self.host} verify MAC"
             )
+        return snapshot
+
+    async def _async_verify_mac(self) -> None:
+        """Check the panel still has the MAC the entry was set up with.
+
+        A different MAC means another panel now answers at this address: a
+        repair issue asks the user to check the configuration.
+        """
+        try:
+            mac = await self.connection.async_call(self.ialarm_device.get_mac)
+        except ConnectionError as error:
+            # Tried again after the next successful poll.
+            _LOGGER.debug("Could not verify the MAC of %s: %s", self.host, error)
+            return
+        self.mac_verified = True
+        issue_id = f"mac_changed_{slugify(self.mac)}"
+        if dr.format_mac(mac) == dr.format_mac(self.mac):
+            ir.async_delete_issue(self.hass, DOMAIN, issue_id)
+            return
+        _LOGGER.warning(
+            "iAlarm panel %s reports MAC %s instead of %s", self.host, mac, self.mac
+        )
+        ir.async_create_issue(
+            self.hass,
+            DOMAIN,
+            issue_id,
+            is_fixable=False,
+            severity=ir.IssueSeverity.ERROR,
+            translation_key="mac_changed",
+            translation_placeholders={
+                "host": self.host,
+                "expected": self.mac,
+                "found": mac,
+            },
+        )
+
+    async def _async_poll(self) -> IAlarmStatusSnapshot:
+        """Poll the panel and build the status snapshot."""
+        self._cycle_commands = self.connection.commands_issued
+        try:
+            async with asyncio.timeout(POLL_TIMEOUT):
+                fetched = await self._async_fetch_panel_state()
+            zone_status, internal_alarm_status = fetched
+            self._last_status_value = internal_alarm_status["status_value"]
 
             alarm_status_value = IALARM_TO_HASS.get(
                 internal_alarm_status["status_value"]
             )
 
             _LOGGER.debug(
-                "iAlarm raw status [%s], mapped to [%s]",
+                "iAlarm raw status [%s], mapped to [%s]; poll stats %s",
                 internal_alarm_status["status_value"],
                 alarm_status_value,
+                self.poll_stats,
             )
 
-            if (
-                alarm_status_value == AlarmControlPanelState.TRIGGERED
-                and self.send_events
-            ):
-                ialarm_alarmed_zones: list[ZoneStatusType] | None = (
-                    internal_alarm_status["alarmed_zones"]
-                )
-
-                _LOGGER.debug(
-                    "iAlarm in TRIGGERED status with allarmed zones [%s]",
-                    ialarm_alarmed_zones,
+            if self.send_events:
+                self._async_track_alarmed_zones(
+                    alarm_status_value, internal_alarm_status["alarmed_zones"]
                 )
 
-                self.hass.bus.async_fire(
-                    event_type="ialarm_triggered",
-                    event_data={
-                        "alarm_status": "TRIGGERED",
-                        "alarmed_zones": ialarm_alarmed_zones,
-                    },
-                )
+            self.update_interval = self._next_update_interval(alarm_status_value)
 
-            ialarm_status: IAlarmStatusType = IAlarmStatusType(
-                ialarm_status=alarm_status_value, zone_status_list=zone_status
+            ialarm_status = IAlarmStatusSnapshot.from_zone_status(
+                alarm_status_value, zone_status
             )
+            self._async_record_poll(True)
+            if ialarm_status == self.data:
+                # The snapshot hash is its fingerprint. Handing back the very
+                # same object makes the base class skip the listener fan-out.
+                self.poll_stats.updates_skipped += 1
+                return self.data
 
             self.state = ialarm_status
+            self._log_dirty = True
+            self.poll_stats.updates_published += 1
+            if self.snapshot_store is not None:
+                self.snapshot_store.async_save(ialarm_status)
+        except IAlarmRequestAbandoned as error:
+            self.poll_stats.polls_abandoned += 1
+            if self.data is None:
+                raise UpdateFailed("Poll abandoned for a command") from error
+            _LOGGER.debug("Poll abandoned for a command")
+            return self.data
         except ConnectionError as error:
+            self._async_record_poll(False)
             raise UpdateFailed(error) from error
+        except TimeoutError as error:
+            self._async_record_poll(False)
+            message = f"Poll took longer than {POLL_TIMEOUT} s"
+            self.connection.async_record_failure(IAlarmRequestTimeout(message))
+            raise UpdateFailed(message) from error
+        finally:
+            if self.startup_fetches is None:
+                self.startup_fetches = {
+                    "zone_fetches": self.poll_stats.zone_fetches,
+                    "status_fetches": self.poll_stats.status_fetches,
+                }
+                _LOGGER.debug(
+                    "iAlarm panel %s set up with %s", self.host, self.startup_fetches
+                )
         return ialarm_status
@@ -1,20 +1,30 @@
 """Device triggers for iAlarm controller."""
 
+from functools import partial
 import logging
-from typing import Any
+from typing import Any, TypeAlias
 
 from homeassistant.components.device_automation import DEVICE_TRIGGER_BASE_SCHEMA
-from homeassistant.components.homeassistant.triggers import event as event_trigger
 from homeassistant.const import CONF_DEVICE_ID, CONF_DOMAIN, CONF_PLATFORM, CONF_TYPE
-from homeassistant.core import CALLBACK_TYPE, HomeAssistant
-from homeassistant.helpers.trigger import TriggerActionType, TriggerInfo
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Context,
+    Event,
+    HassJob,
+    HomeAssistant,
+    callback,
+)
+from homeassistant.helpers.trigger import TriggerActionType, TriggerData, TriggerInfo
 from homeassistant.helpers.typing import ConfigType
+from homeassistant.util.hass_dict import HassKey
 import voluptuous as vol
 
 from .const import DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
 
+_TriggerJob: TypeAlias = HassJob[[dict[str, Any], Context | None], Any]
+
 TRIGGER_TYPES = {
     "disarmed",
     "armed_home",
@@ -38,6 +48,84 @@ TRIGGER_SCHEMA = DEVICE_TRIGGER_BASE_SCHEMA.extend(
 )
 
 
+class IAlarmTriggerDispatcher:
+    """Route iAlarm events to the device triggers of the panel that fired them.
+
+    A single bus listener per event type serves every attached trigger and
+    looks the triggers up by (device id, trigger type), so an event only
+    wakes the automations bound to the panel that fired it.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the dispatcher."""
+        self.hass = hass
+        self._triggers: dict[
+            tuple[str, str], list[tuple[_TriggerJob, TriggerData]]
+        ] = {}
+        self._trigger_counts: dict[str, int] = {}
+        self._unsub_events: dict[str, CALLBACK_TYPE] = {}
+
+    @callback
+    def async_attach(
+        self,
+        device_id: str,
+        trigger_type: str,
+        job: _TriggerJob,
+        trigger_data: TriggerData,
+    ) -> CALLBACK_TYPE:
+        """Attach a trigger and return a function that detaches it."""
+        key = (device_id, trigger_type)
+        trigger = (job, trigger_data)
+        self._triggers.setdefault(key, []).append(trigger)
+        self._trigger_counts[trigger_type] = (
+            self._trigger_counts.get(trigger_type, 0) + 1
+        )
+        if trigger_type not in self._unsub_events:
+            self._unsub_events[trigger_type] = self.hass.bus.async_listen(
+                EVENT_MAP[trigger_type], partial(self._async_handle_event, trigger_type)
+            )
+
+        @callback
+        def async_detach() -> None:
+            triggers = self._triggers[key]
+            triggers.remove(trigger)
+            if not triggers:
+                del self._triggers[key]
+            self._trigger_counts[trigger_type] -= 1
+            if not self._trigger_counts[trigger_type]:
+                del self._trigger_counts[trigger_type]
+                self._unsub_events.pop(trigger_type)()
+
+        return async_detach
+
+    @callback
+    def _async_handle_event(self, trigger_type: str, event: Event) -> None:
+        """Run the triggers bound to the device that fired the event."""
+        if (device_id := event.data.get(CONF_DEVICE_ID)) is None:
+            return
+        if not (triggers := self._triggers.get((device_id, trigger_type))):
+            return
+        for job, trigger_data in tuple(triggers):
+            self.hass.loop.call_soon(
+                self.hass.async_run_hass_job,
+                job,
+                {
+                    "trigger": {
+                        **trigger_data,
+                        CONF_PLATFORM: "device",
+                        "event": event,
+                        "description": f"event '{event.event_type}'",
+                    }
+                },
+                event.context,
+            )
+
+
+DATA_TRIGGER_DISPATCHER: HassKey[IAlarmTriggerDispatcher] = HassKey(
+    f"{DOMAIN}_trigger_dispatcher"
+)
+
+
 async def async_get_triggers(
     hass: HomeAssistant, device_id: str
 ) -> list[dict[str, Any]]:
@@ -62,16 +150,19 @@ async def async_attach_trigger(
 ) -> CALLBACK_TYPE:
     """Attach a trigger."""
     trigger_type = config[CONF_TYPE]
-    event_type = EVENT_MAP[trigger_type]
-    _LOGGER.debug("Attaching trigger %s for event %s", trigger_type, event_type)
-
-    event_config = event_trigger.TRIGGER_SCHEMA(
-        {
-            event_trigger.CONF_PLATFORM: "event",
-            event_trigger.CONF_EVENT_TYPE: event_type,
-        }
+    device_id = config[CONF_DEVICE_ID]
+    _LOGGER.debug(
+        "Attaching trigger %s for event %s of device %s",
+        trigger_type,
+        EVENT_MAP[trigger_type],
+        device_id,
     )
 
-    return await event_trigger.async_attach_trigger(
-        hass, event_config, action, trigger_info
+    if (dispatcher := hass.data.get(DATA_TRIGGER_DISPATCHER)) is None:
+        dispatcher = hass.data[DATA_TRIGGER_DISPATCHER] = IAlarmTriggerDispatcher(hass)
+    return dispatcher.async_attach(
+        device_id,
+        trigger_type,
+        HassJob(action, f"ialarm device trigger {trigger_info}"),
+        trigger_info["trigger_data"],
     )
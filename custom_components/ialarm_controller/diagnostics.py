@@ -0,0 +1,67 @@
+"""Diagnostics support for iAlarm."""
+
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.components.diagnostics import REDACTED, async_redact_data
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from . import IAlarmConfigEntry
+
+TO_REDACT = {CONF_HOST, "mac"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, config_entry: IAlarmConfigEntry
+) -> dict[str, Any]:
+    """Return the panel traffic and latency statistics of a config entry."""
+    coordinator = config_entry.runtime_data
+    connection = coordinator.connection
+    return {
+        "entry": {
+            "data": async_redact_data(config_entry.data, TO_REDACT),
+            "options": dict(config_entry.options),
+        },
+        "connection": {
+            "state": connection.state,
+            "breaker_state": connection.breaker_state,
+            "consecutive_failures": connection.consecutive_failures,
+            "requests_rejected": connection.requests_rejected,
+            "reconnect_attempts": connection.reconnect_attempts,
+            "last_error": connection.last_error,
+            "round_trips": connection.round_trips,
+        },
+        "link_quality": {
+            "rtt_ms": coordinator.link_quality.rtt,
+            "jitter_ms": coordinator.link_quality.jitter,
+            "poll_success_rate": coordinator.link_quality.success_rate,
+            "last_success": coordinator.link_quality.last_success,
+        },
+        "queues": {
+            priority.name.lower(): asdict(stats)
+            for priority, stats in connection.queue_stats.items()
+        },
+        "latency": {
+            operation: histogram.as_dict()
+            for operation, histogram in sorted(connection.latency.items())
+        },
+        # The reply of get_mac is the MAC of the panel.
+        "exchanges": [
+            {**exchange, "result": REDACTED}
+            if exchange["operation"] == "get_mac"
+            else exchange
+            for exchange in connection.async_dump_exchanges()
+        ],
+        "polling": {
+            **asdict(coordinator.poll_stats),
+            "startup_fetches": coordinator.startup_fetches,
+            "update_interval": coordinator.update_interval.total_seconds()
+            if coordinator.update_interval
+            else None,
+            "last_update_success": coordinator.last_update_success,
+            "coalesced_calls": coordinator.single_flight.coalesced,
+        },
+    }
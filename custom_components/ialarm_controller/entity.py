@@ -38,3 +38,8 @@ class IAlarmEntity(CoordinatorEntity[IAlarmCoordinator]):
                 (CONNECTION_NETWORK_MAC, coordinator.mac)
             }
             self._attr_device_info["identifiers"] = {(DOMAIN, coordinator.mac)}
+
+    @property
+    def available(self) -> bool:
+        """Return True if the panel answered, or a restored state is shown."""
+        return super().available or self.coordinator.shows_restored_state
@@ -0,0 +1,191 @@
+"""Persistent store for the iAlarm panel log.
+
+The panel only keeps a short log history. Every entry synced by the
+coordinator is also written to a small SQLite database in the Home
+Assistant configuration directory, indexed on time, area, event and
+name, so older history can be queried without talking to the panel.
+"""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Iterable
+from contextlib import closing
+import csv
+from datetime import datetime, timedelta
+import logging
+import sqlite3
+from typing import IO, Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pyasyncialarm.const import LogEntryType
+
+_LOGGER = logging.getLogger(__name__)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS log_entries (
+        panel TEXT NOT NULL,
+        time TEXT,
+        area INTEGER,
+        event TEXT,
+        name TEXT,
+        UNIQUE (panel, time, area, event, name)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_log_time ON log_entries (panel, time)",
+    "CREATE INDEX IF NOT EXISTS ix_log_area ON log_entries (panel, area, time)",
+    "CREATE INDEX IF NOT EXISTS ix_log_event ON log_entries (panel, event, time)",
+    "CREATE INDEX IF NOT EXISTS ix_log_name ON log_entries (panel, name, time)",
+)
+
+
+def _format_time(value: datetime | str | None) -> str | None:
+    """Return a sortable text representation of a log time."""
+    if isinstance(value, datetime):
+        # Panel times are naive local times.
+        if value.tzinfo is not None:
+            value = dt_util.as_local(value).replace(tzinfo=None)
+        return value.isoformat(sep=" ")
+    return value
+
+
+def log_entry_key(entry: LogEntryType | dict[str, Any]) -> tuple[Any, ...]:
+    """Return the identity of a log entry, as it is stored."""
+    return _format_time(entry["time"]), entry["area"], entry["event"], entry["name"]
+
+
+class IAlarmLogStore:
+    """SQLite backed history of the log entries of one panel."""
+
+    def __init__(
+        self, hass: HomeAssistant, path: str, panel: str, retention_days: int
+    ) -> None:
+        """Initialize the store."""
+        self.hass = hass
+        self.path = path
+        self.panel = panel
+        self.retention = timedelta(days=retention_days)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def _setup(self) -> None:
+        cutoff = _format_time(dt_util.now().replace(tzinfo=None) - self.retention)
+        with closing(self._connect()) as connection, connection:
+            for statement in _SCHEMA:
+                connection.execute(statement)
+            connection.execute(
+                "DELETE FROM log_entries WHERE panel = ? AND time < ?",
+                (self.panel, cutoff),
+            )
+
+    async def async_setup(self) -> None:
+        """Create the database schema and drop entries past the retention."""
+        await self.hass.async_add_executor_job(self._setup)
+
+    def _add_entries(self, rows: list[tuple[Any, ...]]) -> None:
+        with closing(self._connect()) as connection, connection:
+            connection.executemany(
+                "INSERT OR IGNORE INTO log_entries (panel, time, area, event, name) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    async def async_add_entries(self, entries: Iterable[LogEntryType]) -> None:
+        """Store new log entries, entries already stored are ignored.
+
+        Entries are expected oldest first, so the newest one is the last
+        row written.
+        """
+        rows = [(self.panel, *log_entry_key(entry)) for entry in entries]
+        if rows:
+            await self.hass.async_add_executor_job(self._add_entries, rows)
+
+    async def async_newest_key(self) -> tuple[Any, ...] | None:
+        """Return the identity of the newest stored entry, if there is one."""
+        if newest := await self.async_query(limit=1):
+            return log_entry_key(newest[0])
+        return None
+
+    def _query(self, sql: str, params: list[Any]) -> list[dict[str, Any]]:
+        with closing(self._connect()) as connection:
+            return [dict(row) for row in connection.execute(sql, params)]
+
+    async def async_query(
+        self,
+        *,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+        area: int | None = None,
+        event: str | None = None,
+        name: str | None = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> list[dict[str, Any]]:
+        """Return the stored entries matching the filters, newest first."""
+        clauses = ["panel = ?"]
+        params: list[Any] = [self.panel]
+        if start_time is not None:
+            clauses.append("time >= ?")
+            params.append(_format_time(start_time))
+        if end_time is not None:
+            clauses.append("time <= ?")
+            params.append(_format_time(end_time))
+        if area is not None:
+            clauses.append("area = ?")
+            params.append(area)
+        if event is not None:
+            clauses.append("event = ?")
+            params.append(event)
+        if name is not None:
+            clauses.append("name = ?")
+            params.append(name)
+        params.extend((limit, offset))
+
+        # Only the fixed clauses above are interpolated, values are bound.
+        where = " AND ".join(clauses)
+        sql = (
+            "SELECT time, area, event, name FROM log_entries "  # noqa: S608
+            f"WHERE {where} ORDER BY time DESC, rowid DESC LIMIT ? OFFSET ?"
+        )
+        _LOGGER.debug("Query log store: %s %s", sql, params)
+        return await self.hass.async_add_executor_job(self._query, sql, params)
+
+    async def async_iter_entries(
+        self, chunk_size: int, **filters: Any
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """Yield the matching entries newest first, one chunk at a time."""
+        offset = 0
+        while chunk := await self.async_query(
+            limit=chunk_size, offset=offset, **filters
+        ):
+            yield chunk
+            if len(chunk) < chunk_size:
+                return
+            offset += chunk_size
+
+    async def async_export_csv(self, path: str, chunk_size: int, **filters: Any) -> int:
+        """Write the matching entries to a CSV file, returning how many were written.
+
+        Entries are read and written chunk by chunk, so memory use does not
+        grow with the size of the history.
+        """
+        hass = self.hass
+        csv_file: IO[str] = await hass.async_add_executor_job(
+            lambda: open(path, "w", newline="", encoding="utf-8")  # noqa: SIM115
+        )
+        count = 0
+        try:
+            writer = csv.DictWriter(
+                csv_file, fieldnames=("time", "area", "event", "name")
+            )
+            await hass.async_add_executor_job(writer.writeheader)
+            async for chunk in self.async_iter_entries(chunk_size, **filters):
+                await hass.async_add_executor_job(writer.writerows, chunk)
+                count += len(chunk)
+        finally:
+            await hass.async_add_executor_job(csv_file.close)
+        return count
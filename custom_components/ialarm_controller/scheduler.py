@@ -0,0 +1,143 @@
+"""Domain-wide poll scheduler for iAlarm panels.
+
+Every panel gets its own coordinator, and coordinators with the same
+interval that start together keep polling in lockstep. The scheduler
+gives each coordinator a slot on a phase grid: its scheduled refreshes
+happen at a fixed offset within the interval, so the panels are spread
+evenly over it. A global semaphore also bounds how many scheduled polls
+run at the same time.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import timedelta
+import math
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN, MAX_CONCURRENT_POLLS
+
+if TYPE_CHECKING:
+    from .coordinator import IAlarmCoordinator
+
+
+def _slot_phase(slot: int) -> float:
+    """Return the phase of a slot, as a fraction of the interval.
+
+    Slots follow the van der Corput sequence (0, 1/2, 1/4, 3/4, ...), so
+    the phases stay evenly spread for any number of panels and adding a
+    panel never moves the others.
+    """
+    phase = 0.0
+    denominator = 1
+    while slot:
+        denominator *= 2
+        slot, bit = divmod(slot, 2)
+        phase += bit / denominator
+    return phase
+
+
+class IAlarmPollScheduler:
+    """Spread the scheduled polls of all panels over their interval."""
+
+    def __init__(
+        self, hass: HomeAssistant, max_concurrent: int = MAX_CONCURRENT_POLLS
+    ) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+        self.max_concurrent = max_concurrent
+        self.polls_delayed = 0
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._slots: dict[IAlarmCoordinator, int] = {}
+        self._next_refresh: dict[IAlarmCoordinator, float] = {}
+
+    @callback
+    def async_register(self, coordinator: IAlarmCoordinator) -> CALLBACK_TYPE:
+        """Give the coordinator the lowest free slot of the grid."""
+        used = set(self._slots.values())
+        self._slots[coordinator] = next(
+            slot for slot in range(len(used) + 1) if slot not in used
+        )
+
+        @callback
+        def unregister() -> None:
+            self._slots.pop(coordinator, None)
+            self._next_refresh.pop(coordinator, None)
+
+        return unregister
+
+    def phase(self, coordinator: IAlarmCoordinator) -> float:
+        """Return the phase of the coordinator, as a fraction of its interval."""
+        return _slot_phase(self._slots.get(coordinator, 0))
+
+    @callback
+    def async_next_refresh(
+        self, coordinator: IAlarmCoordinator, interval: float
+    ) -> float:
+        """Return the loop time of the next scheduled refresh.
+
+        That is the first grid point of the coordinator at least half an
+        interval away, so a refresh that ran off the grid, e.g. after a
+        command, is not followed by another one right away.
+        """
+        offset = self.phase(coordinator) * interval
+        earliest = self.hass.loop.time() + interval / 2
+        next_refresh = offset + interval * math.ceil((earliest - offset) / interval)
+        self._next_refresh[coordinator] = next_refresh
+        return next_refresh
+
+    @asynccontextmanager
+    async def async_poll_slot(self) -> AsyncIterator[None]:
+        """Hold one of the global poll slots."""
+        if self._semaphore.locked():
+            self.polls_delayed += 1
+        async with self._semaphore:
+            yield
+
+    @callback
+    def async_schedule(self) -> list[dict[str, Any]]:
+        """Return the scheduled polls of all panels, soonest first."""
+        loop_time = self.hass.loop.time()
+        now = dt_util.utcnow()
+        schedule = []
+        for coordinator, slot in self._slots.items():
+            interval = coordinator.update_interval
+            next_refresh = self._next_refresh.get(coordinator)
+            schedule.append(
+                {
+                    "host": coordinator.host,
+                    "mac": coordinator.mac,
+                    "slot": slot,
+                    "phase": round(_slot_phase(slot), 4),
+                    "interval": interval.total_seconds() if interval else None,
+                    "next_refresh": (
+                        now + timedelta(seconds=next_refresh - loop_time)
+                        if next_refresh is not None
+                        else None
+                    ),
+                }
+            )
+        return sorted(
+            schedule,
+            key=lambda poll: (
+                poll["next_refresh"] is None,
+                poll["next_refresh"] or now,
+            ),
+        )
+
+
+DATA_POLL_SCHEDULER: HassKey[IAlarmPollScheduler] = HassKey(f"{DOMAIN}_poll_scheduler")
+
+
+@callback
+def async_get_poll_scheduler(hass: HomeAssistant) -> IAlarmPollScheduler:
+    """Return the poll scheduler shared by all panels."""
+    if (scheduler := hass.data.get(DATA_POLL_SCHEDULER)) is None:
+        scheduler = hass.data[DATA_POLL_SCHEDULER] = IAlarmPollScheduler(hass)
+    return scheduler
@@ -2,21 +2,31 @@
 
 from __future__ import annotations
 
-import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
 
-from homeassistant.components.sensor import SensorEntity, SensorEntityDescription
-from homeassistant.const import EntityCategory
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfTime
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from pyasyncialarm.const import StatusType
 
-from custom_components.ialarm_controller.const import DOMAIN, IAlarmStatusType
+from custom_components.ialarm_controller.const import (
+    DOMAIN,
+    IAlarmStatusSnapshot,
+    zone_status_names,
+)
 from custom_components.ialarm_controller.entity import IAlarmEntity
 
 from . import IAlarmConfigEntry
-from .coordinator import IAlarmCoordinator
-
-_LOGGER = logging.getLogger(__name__)
+from .connection import IAlarmBreakerState, IAlarmConnectionState, IAlarmRequestPriority
+from .coordinator import IAlarmCoordinator, IAlarmLinkQuality
 
 IAlarmZoneStatusSensorDescription = SensorEntityDescription(
     key="ALARMS",
@@ -24,6 +34,83 @@ IAlarmZoneStatusSensorDescription = SensorEntityDescription(
     entity_category=EntityCategory.DIAGNOSTIC,
 )
 
+IAlarmConnectionSensorDescription = SensorEntityDescription(
+    key="CONNECTION",
+    translation_key="connection",
+    name="Connection",
+    icon="mdi:lan-connect",
+    device_class=SensorDeviceClass.ENUM,
+    options=[state.value for state in IAlarmConnectionState],
+    entity_category=EntityCategory.DIAGNOSTIC,
+)
+
+IAlarmBreakerSensorDescription = SensorEntityDescription(
+    key="CIRCUIT_BREAKER",
+    translation_key="circuit_breaker",
+    name="Circuit breaker",
+    icon="mdi:electric-switch",
+    device_class=SensorDeviceClass.ENUM,
+    options=[state.value for state in IAlarmBreakerState],
+    entity_category=EntityCategory.DIAGNOSTIC,
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class IAlarmLinkQualitySensorDescription(SensorEntityDescription):
+    """Describes a link quality sensor."""
+
+    value_fn: Callable[[IAlarmLinkQuality], float | datetime | None]
+
+
+LINK_QUALITY_SENSORS = (
+    IAlarmLinkQualitySensorDescription(
+        key="ROUND_TRIP_TIME",
+        translation_key="round_trip_time",
+        name="Round-trip time",
+        icon="mdi:timer-outline",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda link: link.rtt,
+    ),
+    IAlarmLinkQualitySensorDescription(
+        key="JITTER",
+        translation_key="jitter",
+        name="Jitter",
+        icon="mdi:chart-bell-curve",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda link: link.jitter,
+    ),
+    IAlarmLinkQualitySensorDescription(
+        key="POLL_SUCCESS_RATE",
+        translation_key="poll_success_rate",
+        name="Poll success rate",
+        icon="mdi:check-network-outline",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda link: link.success_rate,
+    ),
+    IAlarmLinkQualitySensorDescription(
+        key="LAST_SUCCESSFUL_UPDATE",
+        translation_key="last_successful_update",
+        name="Last successful update",
+        icon="mdi:clock-check-outline",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda link: link.last_success,
+    ),
+)
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -35,7 +122,18 @@ async def async_setup_entry(
     if not (unique_id := config_entry.unique_id):
         return
     async_add_entities(
-        [IAlarmSensorEntity(ialarm_coordinator, unique_id, config_entry.title)], True
+        [
+            IAlarmSensorEntity(ialarm_coordinator, unique_id, config_entry.title),
+            IAlarmConnectionSensor(ialarm_coordinator, unique_id, config_entry.title),
+            IAlarmBreakerSensor(ialarm_coordinator, unique_id, config_entry.title),
+            *(
+                IAlarmLinkQualitySensor(
+                    ialarm_coordinator, unique_id, config_entry.title, description
+                )
+                for description in LINK_QUALITY_SENSORS
+            ),
+        ],
+        False,
     )
 
 
@@ -52,57 +150,30 @@ class IAlarmSensorEntity(IAlarmEntity, SensorEntity):
         else:
             self._attr_native_value = "running"
 
-    def _get_sensor_data_attributes(self) -> dict[str, str]:
+    def _get_sensor_data_attributes(self) -> dict[str, Any]:
         """Get iAlarm status data."""
-        # Reset flags at the start of every evaluation so that zones
-        # that have returned to normal are not incorrectly reported as
-        # alarmed or anomalous from the previous update cycle.
-        self._has_alarm = False
-        self._has_anomaly = False
-
-        ialarm_status_data: IAlarmStatusType | None = self.coordinator.data
+        ialarm_status_data: IAlarmStatusSnapshot | None = self.coordinator.data
 
-        result: dict[str, str] = {}
+        result: dict[str, Any] = {}
         result["Integration"] = DOMAIN
 
         if not ialarm_status_data:
+            # Reset flags so that a missing snapshot does not keep reporting
+            # the alarm or anomaly of the previous update cycle.
+            self._has_alarm = False
+            self._has_anomaly = False
             self._update_attr_name()
             return result
 
-        for zone in ialarm_status_data.get("zone_status_list", []):
-            zone_id = zone.get("zone_id")
-            zone_name = zone.get("name") or "N.A."
-            zone_status_alert_type = zone.get("types")
-
-            _LOGGER.debug(
-                "Zone ID: %s, Name: %s, Status Types: %s",
-                zone_id,
-                zone_name,
-                zone_status_alert_type,
+        # A state restored at startup is stale until the panel confirms it.
+        result["Stale"] = ialarm_status_data.stale
+        for zone_id, zone_name, zone_bits in ialarm_status_data.zones():
+            result[f"Zone {zone_id} ({zone_name or 'N.A.'})"] = zone_status_names(
+                zone_bits
             )
 
-            if not (zone_id and zone_name):
-                continue
-
-            if zone_status_alert_type:
-                zone_status_list_for_zone = [
-                    status_type.name
-                    for status_type in zone_status_alert_type
-                    if isinstance(status_type, StatusType)
-                ]
-                if zone_status_list_for_zone:
-                    result[f"Zone {zone_id} ({zone_name})"] = (
-                        f"{', '.join(zone_status_list_for_zone)}"
-                    )
-
-                if "ZONE_ALARM" in zone_status_list_for_zone:
-                    self._has_alarm = True
-                if any(
-                    status not in {"ZONE_NOT_USED", "ZONE_IN_USE", "ZONE_ALARM"}
-                    for status in zone_status_list_for_zone
-                ):
-                    self._has_anomaly = True
-
+        self._has_alarm = ialarm_status_data.has_alarm
+        self._has_anomaly = ialarm_status_data.has_anomaly
         self._update_attr_name()
         return result
 
@@ -124,3 +195,122 @@ class IAlarmSensorEntity(IAlarmEntity, SensorEntity):
         """Handle updated data from the coordinator."""
         self._attr_extra_state_attributes = self._get_sensor_data_attributes()
         self.async_write_ha_state()
+
+
+class IAlarmConnectionSensor(IAlarmEntity, SensorEntity):
+    """State of the connection to the panel."""
+
+    entity_description = IAlarmConnectionSensorDescription
+
+    def __init__(
+        self, coordinator: IAlarmCoordinator, unique_id: str, name: str
+    ) -> None:
+        """Initialize the connection sensor."""
+        super().__init__(coordinator, unique_id, name)
+        self._attr_unique_id = f"{unique_id}_connection"
+
+    @property
+    def available(self) -> bool:
+        """Report the connection even while the panel cannot be polled."""
+        return True
+
+    @property
+    def native_value(self) -> str:
+        """Return the connection state."""
+        return self.coordinator.connection.state
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the last error, reconnect attempts and command queue waits."""
+        connection = self.coordinator.connection
+        commands = connection.queue_stats[IAlarmRequestPriority.COMMAND]
+        return {
+            "last_error": connection.last_error,
+            "reconnect_attempts": connection.reconnect_attempts,
+            "command_queue_wait_ms": round(commands.last_wait * 1000, 1),
+            "command_queue_wait_mean_ms": round(commands.mean_wait * 1000, 1),
+            "command_queue_wait_max_ms": round(commands.max_wait * 1000, 1),
+            "polls_abandoned": self.coordinator.poll_stats.polls_abandoned,
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to the connection state changes."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.connection.async_add_listener(self.async_write_ha_state)
+        )
+
+
+class IAlarmBreakerSensor(IAlarmEntity, SensorEntity):
+    """State of the circuit breaker in front of the panel."""
+
+    entity_description = IAlarmBreakerSensorDescription
+
+    def __init__(
+        self, coordinator: IAlarmCoordinator, unique_id: str, name: str
+    ) -> None:
+        """Initialize the circuit breaker sensor."""
+        super().__init__(coordinator, unique_id, name)
+        self._attr_unique_id = f"{unique_id}_circuit_breaker"
+
+    @property
+    def available(self) -> bool:
+        """Report the breaker even while the panel cannot be polled."""
+        return True
+
+    @property
+    def native_value(self) -> str:
+        """Return the circuit breaker state."""
+        return self.coordinator.connection.breaker_state
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the failure and rejection counters."""
+        connection = self.coordinator.connection
+        return {
+            "consecutive_failures": connection.consecutive_failures,
+            "failure_threshold": connection.failure_threshold,
+            "requests_rejected": connection.requests_rejected,
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to the circuit breaker state changes."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.connection.async_add_listener(self.async_write_ha_state)
+        )
+
+
+class IAlarmLinkQualitySensor(IAlarmEntity, SensorEntity):
+    """Quality figure of the link to the panel, computed from the polls."""
+
+    entity_description: IAlarmLinkQualitySensorDescription
+
+    def __init__(
+        self,
+        coordinator: IAlarmCoordinator,
+        unique_id: str,
+        name: str,
+        description: IAlarmLinkQualitySensorDescription,
+    ) -> None:
+        """Initialize the link quality sensor."""
+        super().__init__(coordinator, unique_id, name)
+        self.entity_description = description
+        self._attr_unique_id = f"{unique_id}_{description.key.lower()}"
+
+    @property
+    def available(self) -> bool:
+        """Report the link quality, above all while the panel cannot be polled."""
+        return True
+
+    @property
+    def native_value(self) -> float | datetime | None:
+        """Return the link quality figure."""
+        return self.entity_description.value_fn(self.coordinator.link_quality)
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to every poll outcome, unchanged snapshots included."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_link_listener(self.async_write_ha_state)
+        )
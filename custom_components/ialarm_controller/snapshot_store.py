@@ -0,0 +1,80 @@
+"""Persistent copy of the last iAlarm panel snapshot.
+
+The coordinator writes every published snapshot to a Home Assistant
+store. At startup the stored snapshot is restored before the panel is
+polled, flagged as stale, so the entities have a state right away even
+when the panel is slow or unreachable.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.components.alarm_control_panel import AlarmControlPanelState
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN, SNAPSHOT_SAVE_DELAY, IAlarmStatusSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+
+class IAlarmSnapshotStore:
+    """Home Assistant store holding the last snapshot of one panel."""
+
+    def __init__(self, hass: HomeAssistant, panel: str) -> None:
+        """Initialize the store."""
+        self.hass = hass
+        self.panel = panel
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.snapshot_{slugify(panel)}"
+        )
+
+    async def async_load(self) -> IAlarmStatusSnapshot | None:
+        """Return the stored snapshot, flagged as stale, if there is one."""
+        if (data := await self._store.async_load()) is None:
+            return None
+        try:
+            alarm_status = data["alarm_status"]
+            snapshot = IAlarmStatusSnapshot(
+                AlarmControlPanelState(alarm_status) if alarm_status else None,
+                (zone[0] for zone in data["zones"]),
+                (zone[1] for zone in data["zones"]),
+                (zone[2] for zone in data["zones"]),
+                stale=True,
+            )
+        except (KeyError, IndexError, TypeError, ValueError) as error:
+            _LOGGER.warning(
+                "Ignoring the stored snapshot of iAlarm panel %s: %s",
+                self.panel,
+                error,
+            )
+            return None
+        _LOGGER.debug(
+            "Restored %s of iAlarm panel %s, saved at %s",
+            snapshot,
+            self.panel,
+            data.get("saved_at"),
+        )
+        return snapshot
+
+    @callback
+    def async_save(self, snapshot: IAlarmStatusSnapshot) -> None:
+        """Write the snapshot after SNAPSHOT_SAVE_DELAY seconds.
+
+        A newer snapshot saved meanwhile replaces it, so only the latest
+        one is written.
+        """
+        saved_at = dt_util.utcnow().isoformat()
+        self._store.async_delay_save(
+            lambda: {
+                "alarm_status": snapshot.ialarm_status,
+                "zones": [list(zone) for zone in snapshot.zones()],
+                "saved_at": saved_at,
+            },
+            SNAPSHOT_SAVE_DELAY,
+        )
@@ -1,10 +1,11 @@
 """Global fixtures for ialarm_controller integration."""
 
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, PropertyMock, patch
 from uuid import uuid4
 
 from custom_components.ialarm_controller.const import DOMAIN
 from homeassistant import loader
+from homeassistant.const import CONF_HOST, CONF_PORT
 from homeassistant.core import HomeAssistant
 import pytest
 from pytest_homeassistant_custom_component.common import MockConfigEntry
@@ -20,17 +21,36 @@ def enable_custom_integrations(hass: HomeAssistant) -> None:  # noqa: PT004
     hass.data.pop(loader.DATA_CUSTOM_COMPONENTS)
 
 
+@pytest.fixture(name="isolated_config_dir", autouse=True)
+def isolated_config_dir(hass: HomeAssistant, tmp_path) -> None:
+    """Keep files written by the integration (log store) out of the shared config dir."""
+    hass.config.config_dir = str(tmp_path)
+
+
+@pytest.fixture(name="entity_registry_enabled_by_default")
+def entity_registry_enabled_by_default():
+    """Enable the entities that are disabled by default."""
+    with patch(
+        "homeassistant.helpers.entity.Entity.entity_registry_enabled_default",
+        new_callable=PropertyMock,
+        return_value=True,
+    ):
+        yield
+
+
 @pytest.fixture(name="ialarm_api")
 def ialarm_api_fixture():
     """Set up IAlarm API fixture."""
     with patch("custom_components.ialarm_controller.IAlarm") as mock_ialarm_api:
         mock_instance = mock_ialarm_api.return_value
+        mock_instance.host = TEST_DATA[CONF_HOST]
+        mock_instance.port = TEST_DATA[CONF_PORT]
         mock_instance.get_mac = AsyncMock(return_value="00:11:22:33:44:55")
         mock_instance.get_zone_status = AsyncMock(return_value=[])
         mock_instance.get_status = AsyncMock(
             return_value={"status_value": 0, "alarmed_zones": []}
         )
-        mock_instance.get_last_log_entries = AsyncMock(return_value=[])
+        mock_instance.get_log = AsyncMock(return_value=[])
         mock_instance.arm_away = AsyncMock()
         mock_instance.arm_stay = AsyncMock()
         mock_instance.disarm = AsyncMock()
@@ -56,6 +76,6 @@ def mock_config_fixture():
         title="Mock iAlarm config entry",
         domain=DOMAIN,
         data=TEST_DATA,
-        unique_id=str(uuid4()),
+        unique_id="00:11:22:33:44:55",
         entry_id=str(uuid4()),
     )
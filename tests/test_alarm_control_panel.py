@@ -3,7 +3,11 @@
 from unittest.mock import AsyncMock
 
 from custom_components.ialarm_controller.alarm_control_panel import IAlarmPanel
-from homeassistant.components.alarm_control_panel import DOMAIN as ALARM_DOMAIN
+from custom_components.ialarm_controller.const import DOMAIN
+from homeassistant.components.alarm_control_panel import (
+    DOMAIN as ALARM_DOMAIN,
+    AlarmControlPanelState,
+)
 from homeassistant.const import (
     ATTR_ENTITY_ID,
     CONF_EVENT,
@@ -12,8 +16,9 @@ from homeassistant.const import (
     SERVICE_ALARM_DISARM,
 )
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.exceptions import ServiceValidationError
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
 from homeassistant.helpers import entity_registry as er
+from pyasyncialarm.pyasyncialarm import IAlarm
 import pytest
 
 
@@ -247,3 +252,111 @@ async def test_alarm_control_panel_state_property_none(
         mock_config_entry.title,
     )
     assert panel.state is None
+
+
+async def test_alarm_control_panel_get_log_service(
+    hass: HomeAssistant,
+    mock_config_entry,
+    ialarm_api,
+) -> None:
+    """Test the get_log entity service returns the log entries."""
+    ialarm_api.return_value.get_log = AsyncMock(
+        return_value=[{"time": "12:00", "area": 0, "event": "arm", "name": "user"}]
+    )
+    mock_config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity_id = "alarm_control_panel.mock_ialarm_config_entry_ialarm_panel"
+    response = await hass.services.async_call(
+        DOMAIN,
+        "get_log",
+        {ATTR_ENTITY_ID: entity_id, "max_entries": 5},
+        blocking=True,
+        return_response=True,
+    )
+    assert response[entity_id]["items"][0]["event"] == "arm"
+
+
+async def test_alarm_control_panel_optimistic_state(
+    hass: HomeAssistant,
+    mock_config_entry,
+    ialarm_api,
+) -> None:
+    """Test commands show their state at once, then confirm or roll back."""
+    ialarm_api.return_value.get_status = AsyncMock(
+        return_value={"status_value": IAlarm.DISARMED, "alarmed_zones": []}
+    )
+    mock_config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = mock_config_entry.runtime_data
+    coordinator.command_confirm_interval = 0
+    entity_id = "alarm_control_panel.mock_ialarm_config_entry_ialarm_panel"
+    failures = []
+    hass.bus.async_listen("ialarm_command_failed", failures.append)
+
+    # The panel confirms on the second poll.
+    statuses = iter([IAlarm.DISARMED])
+    ialarm_api.return_value.get_status.side_effect = lambda _zones: {
+        "status_value": next(statuses, IAlarm.ARMED_STAY),
+        "alarmed_zones": [],
+    }
+    await hass.services.async_call(
+        ALARM_DOMAIN,
+        SERVICE_ALARM_ARM_HOME,
+        {ATTR_ENTITY_ID: entity_id, "code": "1234"},
+        blocking=True,
+    )
+    assert hass.states.get(entity_id).state == AlarmControlPanelState.ARMED_HOME
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert ialarm_api.return_value.get_status.await_count >= 2
+    assert hass.states.get(entity_id).state == AlarmControlPanelState.ARMED_HOME
+    assert coordinator.pending_command_state is None
+    assert not failures
+
+    # The panel never confirms: roll back and report it.
+    ialarm_api.return_value.get_status.side_effect = None
+    ialarm_api.return_value.get_status.return_value = {
+        "status_value": IAlarm.ARMED_STAY,
+        "alarmed_zones": [],
+    }
+    await hass.services.async_call(
+        ALARM_DOMAIN,
+        SERVICE_ALARM_ARM_AWAY,
+        {ATTR_ENTITY_ID: entity_id, "code": "1234"},
+        blocking=True,
+    )
+    assert hass.states.get(entity_id).state == AlarmControlPanelState.ARMED_AWAY
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert hass.states.get(entity_id).state == AlarmControlPanelState.ARMED_HOME
+    assert len(failures) == 1
+    assert failures[0].data["expected_state"] == AlarmControlPanelState.ARMED_AWAY
+    assert failures[0].data["alarm_status"] == AlarmControlPanelState.ARMED_HOME
+
+
+async def test_alarm_control_panel_circuit_open(
+    hass: HomeAssistant,
+    mock_config_entry,
+    ialarm_api,
+) -> None:
+    """Test a command sent while the circuit breaker is open fails cleanly."""
+    mock_config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    mock_config_entry.runtime_data.connection.async_trip(ConnectionError("down"))
+    with pytest.raises(HomeAssistantError) as error:
+        await hass.services.async_call(
+            ALARM_DOMAIN,
+            SERVICE_ALARM_ARM_AWAY,
+            {
+                ATTR_ENTITY_ID: "alarm_control_panel.mock_ialarm_config_entry_ialarm_panel",
+                "code": "1234",
+            },
+            blocking=True,
+        )
+    assert error.value.translation_key == "command_failed"
+    assert error.value.translation_placeholders["command"] == "arm_away"
+    ialarm_api.return_value.arm_away.assert_not_awaited()
@@ -0,0 +1,84 @@
+"""Test the iAlarm zone binary sensors."""
+
+from unittest.mock import AsyncMock
+
+from homeassistant.const import STATE_OFF, STATE_ON, STATE_UNAVAILABLE
+from homeassistant.core import HomeAssistant
+from pyasyncialarm.const import StatusType
+
+
+async def test_zone_binary_sensors(
+    hass: HomeAssistant,
+    mock_config_entry,
+    ialarm_api,
+) -> None:
+    """Test one binary sensor is created per zone in use."""
+    ialarm_api.return_value.get_zone_status = AsyncMock(
+        return_value=[
+            {"zone_id": 1, "name": "Main Door", "types": [StatusType.ZONE_IN_USE]},
+            {
+                "zone_id": 2,
+                "name": "Window",
+                "types": [StatusType.ZONE_IN_USE, StatusType.ZONE_BYPASS],
+            },
+            {"zone_id": 3, "name": "Unused", "types": [StatusType.ZONE_NOT_USED]},
+        ]
+    )
+    mock_config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    door = hass.states.get("binary_sensor.mock_ialarm_config_entry_main_door")
+    window = hass.states.get("binary_sensor.mock_ialarm_config_entry_window")
+    assert door.state == STATE_OFF
+    assert door.attributes["zone_id"] == 1
+    assert window.state == STATE_OFF
+    assert window.attributes["bypass"] is True
+    assert hass.states.get("binary_sensor.mock_ialarm_config_entry_unused") is None
+
+
+async def test_zone_binary_sensor_only_writes_own_zone(
+    hass: HomeAssistant,
+    mock_config_entry,
+    ialarm_api,
+) -> None:
+    """Test a zone change only rewrites the state of that zone."""
+    ialarm_api.return_value.get_zone_status = AsyncMock(
+        return_value=[
+            {"zone_id": 1, "name": "Main Door", "types": [StatusType.ZONE_IN_USE]},
+            {"zone_id": 2, "name": "Window", "types": [StatusType.ZONE_IN_USE]},
+        ]
+    )
+    mock_config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    door_id = "binary_sensor.mock_ialarm_config_entry_main_door"
+    window_id = "binary_sensor.mock_ialarm_config_entry_window"
+    door_updated = hass.states.get(door_id).last_updated
+
+    ialarm_api.return_value.get_zone_status.return_value = [
+        {"zone_id": 1, "name": "Main Door", "types": [StatusType.ZONE_IN_USE]},
+        {
+            "zone_id": 2,
+            "name": "Window",
+            "types": [StatusType.ZONE_IN_USE, StatusType.ZONE_ALARM],
+        },
+    ]
+    coordinator = mock_config_entry.runtime_data
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    window = hass.states.get(window_id)
+    assert window.state == STATE_ON
+    assert window.attributes["alarm"] is True
+    assert hass.states.get(door_id).last_updated == door_updated
+
+    # The zone disappearing from the panel makes the entity unavailable.
+    ialarm_api.return_value.get_zone_status.return_value = [
+        {"zone_id": 1, "name": "Main Door", "types": [StatusType.ZONE_IN_USE]},
+    ]
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert hass.states.get(window_id).state == STATE_UNAVAILABLE
+    assert hass.states.get(door_id).state == STATE_OFF
@@ -5,6 +5,8 @@ from unittest.mock import AsyncMock
 from homeassistant.components.button import DOMAIN as BUTTON_DOMAIN, SERVICE_PRESS
 from homeassistant.const import ATTR_ENTITY_ID
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+import pytest
 
 
 async def test_button_cancel_alarm(
@@ -56,7 +58,7 @@ async def test_button_get_log(
 
     entity_id = "button.mock_ialarm_config_entry_log_alerts"
 
-    ialarm_api.return_value.get_last_log_entries = AsyncMock(return_value=[])
+    ialarm_api.return_value.get_log = AsyncMock(return_value=[])
 
     await hass.services.async_call(
         BUTTON_DOMAIN,
@@ -65,4 +67,37 @@ async def test_button_get_log(
         blocking=True,
     )
 
-    ialarm_api.return_value.get_last_log_entries.assert_awaited_once()
+    ialarm_api.return_value.get_log.assert_awaited_once()
+
+
+async def test_button_unreachable_panel(
+    hass: HomeAssistant,
+    mock_config_entry,
+    ialarm_api,
+) -> None:
+    """Test a press the panel cannot serve fails with a translated error."""
+    mock_config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    ialarm_api.return_value.get_log = AsyncMock(side_effect=ConnectionError("reset"))
+    with pytest.raises(HomeAssistantError) as error:
+        await hass.services.async_call(
+            BUTTON_DOMAIN,
+            SERVICE_PRESS,
+            {ATTR_ENTITY_ID: "button.mock_ialarm_config_entry_log_alerts"},
+            blocking=True,
+        )
+    assert error.value.translation_key == "log_sync_failed"
+
+    # Commands are rejected at once while the circuit breaker is open.
+    mock_config_entry.runtime_data.connection.async_trip(ConnectionError("down"))
+    with pytest.raises(HomeAssistantError) as error:
+        await hass.services.async_call(
+            BUTTON_DOMAIN,
+            SERVICE_PRESS,
+            {ATTR_ENTITY_ID: "button.mock_ialarm_config_entry_cancel_alarm_alerts"},
+            blocking=True,
+        )
+    assert error.value.translation_key == "command_failed"
+    ialarm_api.return_value.cancel_alarm.assert_not_awaited()
@@ -2,8 +2,17 @@
 
 from unittest.mock import patch
 
-from custom_components.ialarm_controller.const import DOMAIN
+from custom_components.ialarm_controller.const import (
+    CONF_EVENT_COALESCE_WINDOW,
+    CONF_REQUIRE_CODE_TO_ARM,
+    CONF_REQUIRE_CODE_TO_DISARM,
+    CONF_SCAN_INTERVAL_ACTIVE,
+    CONF_SCAN_INTERVAL_IDLE,
+    CONF_ZONE_SWEEP_CYCLES,
+    DOMAIN,
+)
 from homeassistant import config_entries
+from homeassistant.const import CONF_EVENT
 from homeassistant.core import HomeAssistant
 from homeassistant.data_entry_flow import FlowResultType
 from pytest_homeassistant_custom_component.common import MockConfigEntry
@@ -104,3 +113,37 @@ async def test_form_already_configured(hass: HomeAssistant) -> None:
 
     assert result2["type"] is FlowResultType.ABORT
     assert result2["reason"] == "already_configured"
+
+
+async def test_options_flow(hass: HomeAssistant) -> None:
+    """Test the options flow stores the polling intervals."""
+    mock_entry = MockConfigEntry(domain=DOMAIN, unique_id=TEST_MAC, data=TEST_DATA)
+    mock_entry.add_to_hass(hass)
+
+    with patch(
+        "custom_components.ialarm_controller.async_setup_entry",
+        return_value=True,
+    ):
+        result = await hass.config_entries.options.async_init(mock_entry.entry_id)
+        assert result["type"] is FlowResultType.FORM
+        assert result["step_id"] == "init"
+
+        result2 = await hass.config_entries.options.async_configure(
+            result["flow_id"],
+            user_input={
+                CONF_EVENT: False,
+                CONF_REQUIRE_CODE_TO_ARM: False,
+                CONF_REQUIRE_CODE_TO_DISARM: True,
+                CONF_SCAN_INTERVAL_ACTIVE: 2,
+                CONF_SCAN_INTERVAL_IDLE: 120,
+                CONF_ZONE_SWEEP_CYCLES: 4,
+                CONF_EVENT_COALESCE_WINDOW: 5,
+            },
+        )
+        await hass.async_block_till_done()
+
+    assert result2["type"] is FlowResultType.CREATE_ENTRY
+    assert mock_entry.options[CONF_SCAN_INTERVAL_ACTIVE] == 2
+    assert mock_entry.options[CONF_SCAN_INTERVAL_IDLE] == 120
+    assert mock_entry.options[CONF_ZONE_SWEEP_CYCLES] == 4
+    assert mock_entry.options[CONF_EVENT_COALESCE_WINDOW] == 5
@@ -0,0 +1,451 @@
+"""Test the iAlarm managed connection."""
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, patch
+
+from custom_components.ialarm_controller.connection import (
+    IAlarmBreakerState,
+    IAlarmCircuitOpen,
+    IAlarmConnection,
+    IAlarmConnectionState,
+    IAlarmLatencyHistogram,
+    IAlarmRequestAbandoned,
+    IAlarmRequestPriority,
+    IAlarmRequestTimeout,
+)
+from custom_components.ialarm_controller.const import (
+    DEFAULT_SCAN_INTERVAL_IDLE,
+    EXCHANGE_REPR_LIMIT,
+    KEEPALIVE_INTERVAL,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pyasyncialarm.pyasyncialarm import IAlarm
+import pytest
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+
+async def test_connection_sensor(
+    hass: HomeAssistant,
+    mock_config_entry,
+    ialarm_api,
+) -> None:
+    """Test the connection state is exposed as a diagnostic sensor."""
+    mock_config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity_id = "sensor.mock_ialarm_config_entry_connection"
+    assert hass.states.get(entity_id).state == IAlarmConnectionState.CONNECTED
+
+    ialarm_api.return_value.get_status = AsyncMock(side_effect=ConnectionError("reset"))
+    await mock_config_entry.runtime_data.async_refresh()
+    await hass.async_block_till_done()
+    state = hass.states.get(entity_id)
+    assert state.state == IAlarmConnectionState.DISCONNECTED
+    assert state.attributes["last_error"] == "reset"
+    assert state.attributes["reconnect_attempts"] == 1
+
+
+async def test_keepalive_only_when_idle(hass: HomeAssistant, ialarm_api) -> None:
+    """Test a heartbeat is only sent when no request went out meanwhile."""
+    device = ialarm_api.return_value
+    connection = IAlarmConnection(hass, device, keepalive_interval=30)
+    connection.async_start()
+    await connection.async_call(device.get_status, [])
+    assert connection.state == IAlarmConnectionState.CONNECTED
+
+    with patch(
+        "custom_components.ialarm_controller.connection.monotonic",
+        return_value=connection._last_activity + 1,
+    ):
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=31))
+        await hass.async_block_till_done()
+    device.get_mac.assert_not_awaited()
+
+    with patch(
+        "custom_components.ialarm_controller.connection.monotonic",
+        return_value=connection._last_activity + 60,
+    ):
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=62))
+        await hass.async_block_till_done()
+    device.get_mac.assert_awaited_once()
+
+    await connection.async_shutdown()
+
+
+async def test_no_heartbeat_between_idle_polls(
+    hass: HomeAssistant, mock_config_entry, ialarm_api
+) -> None:
+    """Test idle polling at the default interval keeps the session open alone."""
+    device = ialarm_api.return_value
+    device.get_status = AsyncMock(
+        return_value={"status_value": IAlarm.DISARMED, "alarmed_zones": []}
+    )
+    mock_config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = mock_config_entry.runtime_data
+    connection = coordinator.connection
+    assert coordinator.update_interval == timedelta(seconds=DEFAULT_SCAN_INTERVAL_IDLE)
+    assert DEFAULT_SCAN_INTERVAL_IDLE > KEEPALIVE_INTERVAL
+    mac_checks = device.get_mac.await_count
+
+    # Steady state: a grid poll every interval. Whatever the phase of the
+    # keepalive ticks, a silent session is always within a keepalive
+    # interval of the next poll.
+    next_poll_at = connection.next_poll_at
+    last_activity = next_poll_at - DEFAULT_SCAN_INTERVAL_IDLE
+    for phase in (0, 10, 20, 29.9):
+        silence = phase
+        while silence < DEFAULT_SCAN_INTERVAL_IDLE:
+            connection._last_activity = last_activity
+            with patch(
+                "custom_components.ialarm_controller.connection.monotonic",
+                return_value=last_activity + silence,
+            ):
+                await connection._async_keepalive(dt_util.utcnow())
+            silence += KEEPALIVE_INTERVAL
+    assert device.get_mac.await_count == mac_checks
+
+    # Without a scheduled poll, a silent session still gets its heartbeat.
+    connection.next_poll_at = None
+    with patch(
+        "custom_components.ialarm_controller.connection.monotonic",
+        return_value=last_activity + KEEPALIVE_INTERVAL,
+    ):
+        await connection._async_keepalive(dt_util.utcnow())
+    assert device.get_mac.await_count == mac_checks + 1
+
+
+async def test_reconnect_with_backoff(hass: HomeAssistant, ialarm_api) -> None:
+    """Test a lost connection is retried with a growing, jittered delay."""
+    device = ialarm_api.return_value
+    device.get_status = AsyncMock(side_effect=ConnectionError("reset"))
+    device.get_mac = AsyncMock(side_effect=ConnectionError("refused"))
+    connection = IAlarmConnection(hass, device, backoff_min=1, backoff_max=4)
+    states = []
+    connection.async_add_listener(lambda: states.append(connection.state))
+
+    with (
+        patch(
+            "custom_components.ialarm_controller.connection.random.uniform",
+            return_value=1,
+        ),
+        patch(
+            "custom_components.ialarm_controller.connection.async_call_later"
+        ) as call_later,
+    ):
+        with pytest.raises(ConnectionError):
+            await connection.async_call(device.get_status, [])
+        assert connection.state == IAlarmConnectionState.DISCONNECTED
+        assert connection.last_error == "reset"
+
+        # Failed reconnects double the delay up to the maximum.
+        delays = []
+        for _ in range(4):
+            delays.append(call_later.call_args.args[1])
+            await call_later.call_args.args[2](dt_util.utcnow())
+        assert delays == [1, 2, 4, 4]
+        assert connection.last_error == "refused"
+
+        device.get_mac = AsyncMock(return_value="00:11:22:33:44:55")
+        await call_later.call_args.args[2](dt_util.utcnow())
+
+    assert connection.state == IAlarmConnectionState.CONNECTED
+    assert connection.reconnect_attempts == 0
+    assert states[:3] == [
+        IAlarmConnectionState.CONNECTING,
+        IAlarmConnectionState.DISCONNECTED,
+        IAlarmConnectionState.CONNECTING,
+    ]
+
+    await connection.async_shutdown()
+    assert connection.state == IAlarmConnectionState.DISCONNECTED
+    device.shutdown.assert_awaited_once()
+
+
+async def test_shutdown_cancels_reconnect(hass: HomeAssistant, ialarm_api) -> None:
+    """Test no reconnect is attempted once the connection is shut down."""
+    device = ialarm_api.return_value
+    device.get_status = AsyncMock(side_effect=ConnectionError)
+    connection = IAlarmConnection(hass, device)
+
+    with pytest.raises(ConnectionError):
+        await connection.async_call(device.get_status, [])
+    assert connection.last_error == "ConnectionError"
+    await connection.async_shutdown()
+
+    with pytest.raises(ConnectionError):
+        await connection.async_call(device.get_status, [])
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=600))
+    await hass.async_block_till_done()
+    device.get_mac.assert_not_awaited()
+
+
+async def test_commands_jump_ahead_of_polls(hass: HomeAssistant, ialarm_api) -> None:
+    """Test queued commands are served first and drop abandonable polls."""
+    connection = IAlarmConnection(hass, ialarm_api.return_value)
+    order = []
+    release = asyncio.Event()
+
+    async def request(name: str, wait: bool = False) -> str:
+        if wait:
+            await release.wait()
+        order.append(name)
+        return name
+
+    in_flight = hass.async_create_task(connection.async_call(request, "poll", True))
+    await asyncio.sleep(0)
+    log_sync = hass.async_create_task(connection.async_call(request, "log"))
+    zones = hass.async_create_task(
+        connection.async_call(request, "zones", abandonable=True)
+    )
+    await asyncio.sleep(0)
+    command = hass.async_create_task(
+        connection.async_call(request, "disarm", priority=IAlarmRequestPriority.COMMAND)
+    )
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await command == "disarm"
+    assert await in_flight == "poll"
+    assert await log_sync == "log"
+    with pytest.raises(IAlarmRequestAbandoned):
+        await zones
+    assert order == ["poll", "disarm", "log"]
+
+    command_stats = connection.queue_stats[IAlarmRequestPriority.COMMAND]
+    poll_stats = connection.queue_stats[IAlarmRequestPriority.POLL]
+    assert command_stats.requests == 1
+    assert command_stats.max_wait > 0
+    assert command_stats.mean_wait == command_stats.max_wait
+    assert poll_stats.requests == 2
+    assert poll_stats.abandoned == 1
+    assert not connection._busy
+
+
+async def test_cancelled_request_leaves_the_queue(
+    hass: HomeAssistant, ialarm_api
+) -> None:
+    """Test a request cancelled while queued does not block the panel."""
+    connection = IAlarmConnection(hass, ialarm_api.return_value)
+    release = asyncio.Event()
+
+    async def request() -> None:
+        await release.wait()
+
+    in_flight = hass.async_create_task(connection.async_call(request))
+    await asyncio.sleep(0)
+    queued = hass.async_create_task(connection.async_call(request))
+    await asyncio.sleep(0)
+    queued.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+    assert not connection._waiters
+
+    release.set()
+    await in_flight
+    assert not connection._busy
+    assert connection.queue_stats[IAlarmRequestPriority.POLL].mean_wait == 0
+
+
+async def test_cancelled_abandoned_poll_keeps_one_owner(
+    hass: HomeAssistant, ialarm_api
+) -> None:
+    """Test a poll cancelled after being abandoned does not hand the panel over."""
+    connection = IAlarmConnection(hass, ialarm_api.return_value)
+    release = asyncio.Event()
+    running = []
+    max_running = 0
+
+    async def request(name: str, wait: bool = False) -> str:
+        nonlocal max_running
+        running.append(name)
+        max_running = max(max_running, len(running))
+        if wait:
+            await release.wait()
+        await asyncio.sleep(0)
+        running.remove(name)
+        return name
+
+    in_flight = hass.async_create_task(connection.async_call(request, "poll", True))
+    await asyncio.sleep(0)
+    zones = hass.async_create_task(
+        connection.async_call(request, "zones", abandonable=True)
+    )
+    await asyncio.sleep(0)
+    command = hass.async_create_task(
+        connection.async_call(request, "disarm", priority=IAlarmRequestPriority.COMMAND)
+    )
+    # The zones poll got IAlarmRequestAbandoned but has not resumed yet.
+    assert not zones.done()
+    zones.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await zones
+    await asyncio.sleep(0)
+    assert running == ["poll"]
+
+    release.set()
+    assert await in_flight == "poll"
+    assert await command == "disarm"
+    assert max_running == 1
+    assert not connection._busy
+    assert connection.queue_stats[IAlarmRequestPriority.POLL].abandoned == 1
+
+
+async def test_request_timeout_closes_the_session(
+    hass: HomeAssistant, ialarm_api
+) -> None:
+    """Test a request past its budget fails and drops the panel session."""
+    device = ialarm_api.return_value
+    connection = IAlarmConnection(hass, device, request_timeout=0.01)
+
+    async def hang(*args) -> None:
+        await asyncio.Event().wait()
+
+    device.get_status = AsyncMock(side_effect=hang)
+    with (
+        patch("custom_components.ialarm_controller.connection.async_call_later"),
+        pytest.raises(IAlarmRequestTimeout),
+    ):
+        await connection.async_call(device.get_status, [])
+    device.shutdown.assert_awaited_once()
+    assert connection.state == IAlarmConnectionState.DISCONNECTED
+    assert not connection._busy
+
+
+async def test_circuit_breaker(
+    hass: HomeAssistant,
+    mock_config_entry,
+    ialarm_api,
+) -> None:
+    """Test the breaker opens after failures, fails fast and closes on a probe."""
+    mock_config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity_id = "sensor.mock_ialarm_config_entry_circuit_breaker"
+    assert hass.states.get(entity_id).state == IAlarmBreakerState.CLOSED
+
+    device = ialarm_api.return_value
+    connection = mock_config_entry.runtime_data.connection
+    device.get_status = AsyncMock(side_effect=ConnectionError("reset"))
+    device.get_mac = AsyncMock(side_effect=ConnectionError("refused"))
+    with patch(
+        "custom_components.ialarm_controller.connection.async_call_later"
+    ) as call_later:
+        for _ in range(connection.failure_threshold):
+            with pytest.raises(ConnectionError):
+                await connection.async_call(device.get_status, [])
+        assert connection.breaker_state == IAlarmBreakerState.OPEN
+
+        # While open, nothing is sent to the panel.
+        device.get_status.reset_mock()
+        with pytest.raises(IAlarmCircuitOpen):
+            await connection.async_call(device.get_status, [])
+        device.get_status.assert_not_awaited()
+        assert connection.requests_rejected == 1
+        await hass.async_block_till_done()
+        assert hass.states.get(entity_id).state == IAlarmBreakerState.OPEN
+
+        # A failed probe opens it again, a successful one closes it.
+        await call_later.call_args.args[2](dt_util.utcnow())
+        assert connection.breaker_state == IAlarmBreakerState.OPEN
+        device.get_mac = AsyncMock(return_value="00:11:22:33:44:55")
+        device.get_status = AsyncMock(
+            return_value={"status_value": 0, "alarmed_zones": []}
+        )
+        await call_later.call_args.args[2](dt_util.utcnow())
+
+    assert connection.breaker_state == IAlarmBreakerState.CLOSED
+    await hass.async_block_till_done()
+    # Closing the breaker refreshes the panel right away.
+    device.get_status.assert_awaited_once()
+    assert connection.consecutive_failures == 0
+    assert hass.states.get(entity_id).state == IAlarmBreakerState.CLOSED
+
+
+async def test_latency_histogram(hass: HomeAssistant, ialarm_api) -> None:
+    """Test every panel request is timed in the histogram of its operation."""
+    connection = IAlarmConnection(hass, ialarm_api.return_value)
+
+    async def get_status() -> None:
+        pass
+
+    async def get_mac() -> None:
+        raise ConnectionError("reset")
+
+    result, elapsed = await connection.async_call_timed(get_status)
+    assert result is None
+    assert elapsed == connection.exchanges[-1].elapsed
+    with (
+        patch("custom_components.ialarm_controller.connection.async_call_later"),
+        pytest.raises(ConnectionError),
+    ):
+        await connection.async_call(get_mac)
+    assert connection.latency["get_status"].calls == 1
+    assert connection.latency["get_status"].errors == 0
+    assert connection.latency["get_mac"].errors == 1
+
+    histogram = IAlarmLatencyHistogram()
+    assert histogram.as_dict()["p50_ms"] is None
+    for elapsed in (0.004, 0.2, 0.3, 45):
+        histogram.record(elapsed)
+    summary = histogram.as_dict()
+    assert summary["calls"] == 4
+    assert summary["min_ms"] == 4
+    assert summary["max_ms"] == 45000
+    assert summary["p50_ms"] == 250
+    assert summary["p95_ms"] == 45000
+    assert summary["buckets"]["le_5"] == 1
+    assert summary["buckets"]["le_250"] == 1
+    assert summary["buckets"]["le_500"] == 1
+    assert summary["buckets"]["slower"] == 1
+
+
+async def test_exchange_capture(hass: HomeAssistant, ialarm_api) -> None:
+    """Test the latest exchanges are kept, bounded, and formatted on capture."""
+    with patch(
+        "custom_components.ialarm_controller.connection.EXCHANGE_CAPTURE_SIZE", 2
+    ):
+        connection = IAlarmConnection(hass, ialarm_api.return_value)
+
+    async def get_mac() -> str:
+        return "00:11:22:33:44:55"
+
+    async def get_zone_status() -> list[dict]:
+        return [{"zone_id": zone_id, "name": "Zone"} for zone_id in range(100)]
+
+    async def get_status(zone_status: list) -> None:
+        raise ConnectionError("reset")
+
+    await connection.async_call(get_mac)
+    zones = await connection.async_call(get_zone_status)
+    with (
+        patch("custom_components.ialarm_controller.connection.async_call_later"),
+        pytest.raises(ConnectionError),
+    ):
+        await connection.async_call(get_status, zones)
+
+    # Only short representations are kept, not the zone table itself.
+    assert all(
+        isinstance(exchange.args, str) and isinstance(exchange.result, str)
+        for exchange in connection.exchanges
+    )
+
+    # Only the two latest exchanges are kept.
+    zone_exchange, status_exchange = connection.async_dump_exchanges()
+    assert zone_exchange["operation"] == "get_zone_status"
+    assert zone_exchange["args"] == "()"
+    assert zone_exchange["result"].endswith("...")
+    assert len(zone_exchange["result"]) == EXCHANGE_REPR_LIMIT + 3
+    assert zone_exchange["error"] is None
+    assert status_exchange["operation"] == "get_status"
+    assert status_exchange["args"].endswith("...")
+    assert len(status_exchange["args"]) == EXCHANGE_REPR_LIMIT + 3
+    assert status_exchange["result"] == "None"
+    assert status_exchange["error"] == "ConnectionError('reset')"
+    assert status_exchange["elapsed_ms"] >= 0
@@ -1,13 +1,30 @@
 """Test the iAlarm coordinator."""
 
-from unittest.mock import AsyncMock
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, Mock, patch
 
+from custom_components.ialarm_controller.connection import (
+    IAlarmBreakerState,
+    IAlarmRequestPriority,
+)
+from custom_components.ialarm_controller.const import (
+    BREAKER_FAILURE_THRESHOLD,
+    CONF_EVENT_COALESCE_WINDOW,
+    CONF_SCAN_INTERVAL_ACTIVE,
+    CONF_SCAN_INTERVAL_IDLE,
+    CONF_ZONE_SWEEP_CYCLES,
+    IAlarmStatusSnapshot,
+    zone_status_names,
+)
 from homeassistant.components.alarm_control_panel import AlarmControlPanelState
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
 from pyasyncialarm.const import StatusType
 from pyasyncialarm.pyasyncialarm import IAlarm
 import pytest
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
 
 
 async def test_coordinator_update_data(
@@ -41,12 +58,13 @@ async def test_coordinator_update_data(
     await coordinator.async_request_refresh()
     await hass.async_block_till_done()
 
-    # The setup does a first refresh, and we just did a second one. Both fire an event.
-    assert coordinator.data["ialarm_status"] == AlarmControlPanelState.TRIGGERED
-    assert len(coordinator.data["zone_status_list"]) == 1
+    # The setup does a first refresh, and we just did a second one. Only the
+    # transition to TRIGGERED fires an event.
+    assert coordinator.data.ialarm_status == AlarmControlPanelState.TRIGGERED
+    assert len(coordinator.data) == 1
 
     # Check event bus for the trigger event
-    assert len(events) > 0
+    assert len(events) == 1
 
 
 async def test_coordinator_update_error(
@@ -68,6 +86,36 @@ async def test_coordinator_update_error(
         await coordinator._async_update_data()
 
 
+async def test_coordinator_poll_budget_counts_as_failure(
+    hass: HomeAssistant,
+    mock_config_entry,
+    ialarm_api,
+) -> None:
+    """Test a panel hanging past the poll budget opens the circuit breaker."""
+    mock_config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = mock_config_entry.runtime_data
+    connection = coordinator.connection
+
+    async def hang(*args) -> None:
+        await asyncio.Event().wait()
+
+    ialarm_api.return_value.get_zone_status = AsyncMock(side_effect=hang)
+    ialarm_api.return_value.get_status = AsyncMock(side_effect=hang)
+    with (
+        patch("custom_components.ialarm_controller.coordinator.POLL_TIMEOUT", 0.01),
+        patch("custom_components.ialarm_controller.connection.async_call_later"),
+    ):
+        for failures in range(1, BREAKER_FAILURE_THRESHOLD + 1):
+            with pytest.raises(UpdateFailed, match="Poll took longer"):
+                await coordinator._async_update_data()
+            assert connection.consecutive_failures == failures
+    assert connection.breaker_state == IAlarmBreakerState.OPEN
+    assert connection.last_error == "Poll took longer than 0.01 s"
+
+
 async def test_coordinator_cancel_alarm(
     hass: HomeAssistant,
     mock_config_entry,
@@ -104,13 +152,452 @@ async def test_coordinator_get_log(
     await hass.async_block_till_done()
 
     coordinator = mock_config_entry.runtime_data
-    ialarm_api.return_value.get_last_log_entries = AsyncMock(
+    ialarm_api.return_value.get_log = AsyncMock(return_value=[])
+    response_empty = await coordinator.async_get_log()
+    assert response_empty == {"items": []}
+
+    ialarm_api.return_value.get_log = AsyncMock(
         return_value=[{"time": "12:00", "area": "0", "event": "arm", "name": "user"}]
     )
-
+    coordinator._log_dirty = True
     response = await coordinator.async_get_log()
     assert response["items"][0]["time"] == "12:00"
 
-    ialarm_api.return_value.get_last_log_entries = AsyncMock(return_value=[])
-    response_empty = await coordinator.async_get_log()
-    assert response_empty == {"items": []}
+
+async def test_coordinator_incremental_log_sync(
+    hass: HomeAssistant,
+    mock_config_entry,
+    ialarm_api,
+) -> None:
+    """Test the log is served locally and only new entries are announced."""
+    mock_config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = mock_config_entry.runtime_data
+    events = []
+    hass.bus.async_listen("ialarm_logs", events.append)
+
+    first = {"time": "12:00", "area": 0, "event": "Arming Report", "name": "user"}
+    second = {"time": "12:05", "area": 0, "event": "Disarm report", "name": "user"}
+    get_log = AsyncMock(return_value=[first, None])
+    ialarm_api.return_value.get_log = get_log
+
+    response = await coordinator.async_get_log(10)
+    await hass.async_block_till_done()
+    assert response == {"items": [first]}
+    assert len(events) == 1
+
+    # Nothing changed on the panel: answered from the local buffer.
+    response = await coordinator.async_get_log(10)
+    assert response == {"items": [first]}
+    get_log.assert_awaited_once()
+
+    # A command invalidates the buffer; only the new entry is announced.
+    get_log.return_value = [second, first]
+    await coordinator.async_refresh_after_command()
+    response = await coordinator.async_get_log(1)
+    await hass.async_block_till_done()
+    assert response == {"items": [second]}
+    assert get_log.await_count == 2
+    assert events[-1].data == [second]
+
+    response = await coordinator.async_get_log(10)
+    assert response == {"items": [second, first]}
+
+
+async def test_coordinator_single_flight(
+    hass: HomeAssistant,
+    mock_config_entry,
+    ialarm_api,
+) -> None:
+    """Test identical concurrent requests and repeated commands are sent once."""
+    mock_config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = mock_config_entry.runtime_data
+    device = ialarm_api.return_value
+    release = asyncio.Event()
+
+    async def slow_log(*args):
+        await release.wait()
+        return []
+
+    device.get_log = AsyncMock(side_effect=slow_log)
+    syncs = [hass.async_create_task(coordinator.async_sync_log()) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    assert await asyncio.gather(*syncs) == [[], [], []]
+    device.get_log.assert_awaited_once()
+
+    # Overlapping refreshes share one poll.
+    release.clear()
+    status = await device.get_status()
+
+    async def slow_status(*args):
+        await release.wait()
+        return status
+
+    device.get_status = AsyncMock(side_effect=slow_status)
+    polls = [hass.async_create_task(coordinator._async_update_data()) for _ in range(2)]
+    await asyncio.sleep(0)
+    release.set()
+    first, second = await asyncio.gather(*polls)
+    assert first is second
+    device.get_status.assert_awaited_once()
+    assert coordinator.single_flight.coalesced == 3
+
+    # A repeated command within the window is collapsed into the first one.
+    await coordinator.async_cancel_alarm()
+    await coordinator.async_cancel_alarm()
+    device.cancel_alarm.assert_awaited_once()
+
+    # Another command in between makes the repeat a new intent.
+    await coordinator.async_run_command("disarm", AsyncMock())
+    await coordinator.async_cancel_alarm()
+    assert device.cancel_alarm.await_count == 2
+    await hass.async_block_till_done()
+
+
+async def test_coordinator_adaptive_polling(
+    hass: HomeAssistant,
+    mock_config_entry,
+    ialarm_api,
+) -> None:
+    """Test the scan interval follows the panel state and commands."""
+    mock_config_entry.add_to_hass(hass)
+    hass.config_entries.async_update_entry(
+        mock_config_entry,
+        options={CONF_SCAN_INTERVAL_ACTIVE: 2, CONF_SCAN_INTERVAL_IDLE: 90},
+    )
+    ialarm_api.return_value.get_status = AsyncMock(
+        return_value={"status_value": IAlarm.DISARMED, "alarmed_zones": []}
+    )
+    await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = mock_config_entry.runtime_data
+    assert coordinator.update_interval == timedelta(seconds=90)
+
+    ialarm_api.return_value.get_status = AsyncMock(
+        return_value={"status_value": IAlarm.ARMED_AWAY, "alarmed_zones": []}
+    )
+    await coordinator.async_refresh()
+    assert coordinator.update_interval == timedelta(seconds=2)
+
+    # Back to disarmed, but a command was just sent: keep polling fast.
+    ialarm_api.return_value.get_status = AsyncMock(
+        return_value={"status_value": IAlarm.DISARMED, "alarmed_zones": []}
+    )
+    await coordinator.async_refresh_after_command()
+    await coordinator.async_refresh()
+    assert coordinator.update_interval == timedelta(seconds=2)
+
+    coordinator._fast_poll_until = 0.0
+    await coordinator.async_refresh()
+    assert coordinator.update_interval == timedelta(seconds=90)
+
+
+async def test_coordinator_triggered_events(
+    hass: HomeAssistant,
+    mock_config_entry,
+    ialarm_api,
+) -> None:
+    """Test alarm events fire on transitions and for new zones, coalesced."""
+    door = {"zone_id": 1, "name": "Main Door"}
+    window = {"zone_id": 2, "name": "Window"}
+    garage = {"zone_id": 3, "name": "Garage"}
+    mock_config_entry.add_to_hass(hass)
+    hass.config_entries.async_update_entry(
+        mock_config_entry, options={CONF_EVENT_COALESCE_WINDOW: 10}
+    )
+    ialarm_api.return_value.get_status = AsyncMock(
+        return_value={"status_value": IAlarm.TRIGGERED, "alarmed_zones": [door]}
+    )
+    events = []
+    hass.bus.async_listen("ialarm_triggered", events.append)
+    await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    # The transition is announced right away, further polls are silent.
+    coordinator = mock_config_entry.runtime_data
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert [event.data["alarmed_zones"] for event in events] == [[door]]
+
+    # Zones joining within the window are batched into one event.
+    ialarm_api.return_value.get_status.return_value = {
+        "status_value": IAlarm.TRIGGERED,
+        "alarmed_zones": [door, window],
+    }
+    await coordinator.async_refresh()
+    ialarm_api.return_value.get_status.return_value = {
+        "status_value": IAlarm.TRIGGERED,
+        "alarmed_zones": [door, window, garage],
+    }
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert len(events) == 1
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=11))
+    await hass.async_block_till_done()
+    assert [event.data["alarmed_zones"] for event in events] == [
+        [door],
+        [window, garage],
+    ]
+
+    # A new zone still pending when the alarm ends is not lost.
+    ialarm_api.return_value.get_status.return_value = {
+        "status_value": IAlarm.TRIGGERED,
+        "alarmed_zones": [window],
+    }
+    await coordinator.async_refresh()
+    ialarm_api.return_value.get_status.return_value = {
+        "status_value": IAlarm.TRIGGERED,
+        "alarmed_zones": [door, window],
+    }
+    await coordinator.async_refresh()
+    ialarm_api.return_value.get_status.return_value = {
+        "status_value": IAlarm.DISARMED,
+        "alarmed_zones": [],
+    }
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert events[-1].data["alarmed_zones"] == [door]
+
+    # A new alarm is a new transition.
+    coordinator.event_coalesce_window = 0
+    ialarm_api.return_value.get_status.return_value = {
+        "status_value": IAlarm.TRIGGERED,
+        "alarmed_zones": [garage],
+    }
+    await coordinator.async_refresh()
+    ialarm_api.return_value.get_status.return_value = {
+        "status_value": IAlarm.TRIGGERED,
+        "alarmed_zones": [garage, door],
+    }
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert [event.data["alarmed_zones"] for event in events[-2:]] == [
+        [garage],
+        [door],
+    ]
+
+
+async def test_coordinator_poll_abandoned_for_command(
+    hass: HomeAssistant,
+    mock_config_entry,
+    ialarm_api,
+) -> None:
+    """Test a command sent mid-poll drops the rest of the polling cycle."""
+    mock_config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = mock_config_entry.runtime_data
+    device = ialarm_api.return_value
+    data = coordinator.data
+
+    async def zone_status_during_command():
+        hass.async_create_task(
+            coordinator.connection.async_call(
+                device.disarm, priority=IAlarmRequestPriority.COMMAND
+            )
+        )
+        await asyncio.sleep(0)
+        return []
+
+    device.get_zone_status = AsyncMock(side_effect=zone_status_during_command)
+    device.get_status.reset_mock()
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    device.disarm.assert_awaited_once()
+    device.get_status.assert_not_awaited()
+    assert coordinator.last_update_success
+    assert coordinator.data is data
+    assert coordinator.poll_stats.polls_abandoned == 1
+
+
+async def test_coordinator_tiered_polling(
+    hass: HomeAssistant,
+    mock_config_entry,
+    ialarm_api,
+) -> None:
+    """Test the zone table is only read on change or on the sweep cycle."""
+    mock_config_entry.add_to_hass(hass)
+    hass.config_entries.async_update_entry(
+        mock_config_entry, options={CONF_ZONE_SWEEP_CYCLES: 3}
+    )
+    ialarm_api.return_value.get_zone_status = AsyncMock(
+        return_value=[
+            {"zone_id": 1, "name": "Main Door", "types": [StatusType.ZONE_IN_USE]}
+        ]
+    )
+    ialarm_api.return_value.get_status = AsyncMock(
+        return_value={"status_value": IAlarm.DISARMED, "alarmed_zones": []}
+    )
+    await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = mock_config_entry.runtime_data
+    get_zone_status = ialarm_api.return_value.get_zone_status
+
+    # A status change forces a zone table read in the same cycle.
+    get_zone_status.reset_mock()
+    ialarm_api.return_value.get_status.return_value = {
+        "status_value": IAlarm.ARMED_STAY,
+        "alarmed_zones": [],
+    }
+    await coordinator.async_refresh()
+    assert get_zone_status.await_count == 1
+    assert coordinator.data.ialarm_status == AlarmControlPanelState.ARMED_HOME
+
+    # While armed the zone table is read on every poll.
+    await coordinator.async_refresh()
+    assert get_zone_status.await_count == 2
+
+    ialarm_api.return_value.get_status.return_value = {
+        "status_value": IAlarm.DISARMED,
+        "alarmed_zones": [],
+    }
+    await coordinator.async_refresh()
+    assert get_zone_status.await_count == 3
+
+    # Unchanged status: the cached zone table is reused.
+    skipped = coordinator.poll_stats.zone_fetches_skipped
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+    assert get_zone_status.await_count == 3
+    assert coordinator.poll_stats.zone_fetches_skipped == skipped + 2
+    assert coordinator.poll_stats.zone_records_skipped >= 4
+    assert len(coordinator.data) == 1
+
+    # Safety sweep on the third cycle.
+    await coordinator.async_refresh()
+    assert get_zone_status.await_count == 4
+
+
+async def test_coordinator_skips_unchanged_snapshots(
+    hass: HomeAssistant,
+    mock_config_entry,
+    ialarm_api,
+) -> None:
+    """Test listeners are only woken when the snapshot changes."""
+    ialarm_api.return_value.get_zone_status = AsyncMock(
+        return_value=[
+            {"zone_id": 1, "name": "Main Door", "types": [StatusType.ZONE_IN_USE]}
+        ]
+    )
+    mock_config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = mock_config_entry.runtime_data
+    listener = Mock()
+    coordinator.async_add_listener(listener)
+    published = coordinator.poll_stats.updates_published
+    skipped = coordinator.poll_stats.updates_skipped
+
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+    listener.assert_not_called()
+    assert coordinator.poll_stats.updates_skipped == skipped + 2
+    assert coordinator.poll_stats.skip_ratio > 0
+
+    ialarm_api.return_value.get_zone_status.return_value = [
+        {
+            "zone_id": 1,
+            "name": "Main Door",
+            "types": [StatusType.ZONE_IN_USE, StatusType.ZONE_FAULT],
+        }
+    ]
+    await coordinator.async_refresh()
+    listener.assert_called_once()
+    assert coordinator.poll_stats.updates_published == published + 1
+    assert coordinator.data.zone(1) == (
+        "Main Door",
+        StatusType.ZONE_IN_USE | StatusType.ZONE_FAULT,
+    )
+
+
+async def test_coordinator_zone_listeners(
+    hass: HomeAssistant,
+    mock_config_entry,
+    ialarm_api,
+) -> None:
+    """Test zone listeners only fire for the zones that changed."""
+    ialarm_api.return_value.get_zone_status = AsyncMock(
+        return_value=[
+            {"zone_id": 1, "name": "Main Door", "types": [StatusType.ZONE_IN_USE]},
+            {"zone_id": 2, "name": "Window", "types": [StatusType.ZONE_IN_USE]},
+        ]
+    )
+    mock_config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = mock_config_entry.runtime_data
+    door_listener = Mock()
+    window_listener = Mock()
+    coordinator.async_add_zone_listener(1, door_listener)
+    remove_window = coordinator.async_add_zone_listener(2, window_listener)
+
+    ialarm_api.return_value.get_zone_status.return_value = [
+        {"zone_id": 1, "name": "Main Door", "types": [StatusType.ZONE_IN_USE]},
+        {
+            "zone_id": 2,
+            "name": "Window",
+            "types": [StatusType.ZONE_IN_USE, StatusType.ZONE_ALARM],
+        },
+    ]
+    await coordinator.async_refresh()
+    door_listener.assert_not_called()
+    window_listener.assert_called_once()
+
+    # Losing the panel wakes every zone so entities can go unavailable.
+    ialarm_api.return_value.get_zone_status.side_effect = ConnectionError
+    await coordinator.async_refresh()
+    door_listener.assert_called_once()
+    assert window_listener.call_count == 2
+
+    remove_window()
+    ialarm_api.return_value.get_zone_status.side_effect = None
+    await coordinator.async_refresh()
+    assert door_listener.call_count == 2
+    assert window_listener.call_count == 2
+
+
+def test_status_snapshot() -> None:
+    """Test the compact snapshot shared by the entities."""
+    zones = [
+        {"zone_id": 1, "name": "Door", "types": [StatusType.ZONE_IN_USE]},
+        {
+            "zone_id": 2,
+            "name": "Window",
+            "types": [StatusType.ZONE_IN_USE, StatusType.ZONE_ALARM],
+        },
+        {"zone_id": None, "name": "Broken"},
+    ]
+    snapshot = IAlarmStatusSnapshot.from_zone_status(
+        AlarmControlPanelState.TRIGGERED, zones
+    )
+
+    assert len(snapshot) == 2
+    assert snapshot.zone(2) == ("Window", 3)
+    assert snapshot.zone(3) is None
+    assert snapshot.has_alarm
+    assert not snapshot.has_anomaly
+    assert zone_status_names(snapshot.zone(2)[1]) == "ZONE_IN_USE, ZONE_ALARM"
+    assert zone_status_names(0) == "ZONE_NOT_USED"
+
+    same = IAlarmStatusSnapshot.from_zone_status(
+        AlarmControlPanelState.TRIGGERED, zones
+    )
+    assert same == snapshot
+    assert hash(same) == hash(snapshot)
+    assert snapshot != IAlarmStatusSnapshot(AlarmControlPanelState.TRIGGERED)
+    assert snapshot != "snapshot"
+
+    with pytest.raises(AttributeError):
+        snapshot.ialarm_status = None
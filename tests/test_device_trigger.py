@@ -105,3 +105,54 @@ async def test_if_fires_on_event(
         assert any(
             call.data["message"] == f"fired {trigger_type}" for call in service_calls
         )
+
+
+async def test_trigger_dispatch_per_device(
+    hass: HomeAssistant,
+    mock_config_entry,
+    ialarm_api,
+) -> None:
+    """Test events only run the triggers of the panel that fired them."""
+    mock_config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    device = dr.async_entries_for_config_entry(
+        dr.async_get(hass), mock_config_entry.entry_id
+    )[0]
+    coordinator = mock_config_entry.runtime_data
+    assert coordinator.device_id == device.id
+
+    service_calls = async_mock_service(hass, "test", "automation")
+    assert await async_setup_component(
+        hass,
+        "automation",
+        {
+            "automation": {
+                "trigger": {
+                    CONF_PLATFORM: "device",
+                    CONF_DOMAIN: DOMAIN,
+                    CONF_DEVICE_ID: device.id,
+                    CONF_TYPE: "cancel",
+                },
+                "action": {"service": "test.automation"},
+            }
+        },
+    )
+    await hass.async_block_till_done()
+    assert hass.bus.async_listeners()["cancel_alarm"] == 1
+
+    hass.bus.async_fire("cancel_alarm", {"device_id": "other_panel"})
+    hass.bus.async_fire("cancel_alarm", {})
+    await hass.async_block_till_done()
+    assert not service_calls
+
+    await coordinator.async_cancel_alarm()
+    await hass.async_block_till_done()
+    assert len(service_calls) == 1
+
+    await hass.services.async_call(
+        "automation", "turn_off", {"entity_id": "all"}, blocking=True
+    )
+    await hass.async_block_till_done()
+    assert "cancel_alarm" not in hass.bus.async_listeners()
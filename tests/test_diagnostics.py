@@ -0,0 +1,44 @@
+"""Test the iAlarm diagnostics."""
+
+from custom_components.ialarm_controller.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from homeassistant.core import HomeAssistant
+
+
+async def test_config_entry_diagnostics(
+    hass: HomeAssistant,
+    mock_config_entry,
+    ialarm_api,
+) -> None:
+    """Test the diagnostics report the panel traffic, with the host redacted."""
+
+    async def get_mac() -> str:
+        return "00:11:22:33:44:55"
+
+    ialarm_api.return_value.get_mac = get_mac
+    mock_config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, mock_config_entry)
+
+    assert diagnostics["entry"]["data"]["host"] == "**REDACTED**"
+    connection = diagnostics["connection"]
+    assert connection["state"] == "connected"
+    assert diagnostics["queues"]["poll"]["requests"] == connection["round_trips"]
+    assert (
+        sum(histogram["calls"] for histogram in diagnostics["latency"].values())
+        == connection["round_trips"]
+    )
+    assert diagnostics["polling"]["polls"] == 1
+    assert diagnostics["polling"]["startup_fetches"] == {
+        "zone_fetches": 1,
+        "status_fetches": 1,
+    }
+    exchanges = {
+        exchange["operation"]: exchange for exchange in diagnostics["exchanges"]
+    }
+    assert len(diagnostics["exchanges"]) == connection["round_trips"]
+    assert exchanges["get_mac"]["result"] == "**REDACTED**"
+    assert diagnostics["polling"]["last_update_success"]
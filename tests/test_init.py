@@ -1,11 +1,35 @@
 """Test the iAlarm init."""
 
+import asyncio
+from datetime import timedelta
+from typing import Any
 from unittest.mock import AsyncMock, patch
 
-from custom_components.ialarm_controller import update_listener
+from custom_components.ialarm_controller.connection import IAlarmBreakerState
+from custom_components.ialarm_controller.const import (
+    CONF_REQUIRE_CODE_TO_ARM,
+    CONF_REQUIRE_CODE_TO_DISARM,
+    CONF_SCAN_INTERVAL_ACTIVE,
+    CONF_SCAN_INTERVAL_IDLE,
+    DOMAIN,
+    SNAPSHOT_SAVE_DELAY,
+    STALE_MAX_FAILED_POLLS,
+)
+from homeassistant.components.alarm_control_panel import AlarmControlPanelState
 from homeassistant.config_entries import ConfigEntryState
-from homeassistant.const import EVENT_HOMEASSISTANT_STOP
-from homeassistant.core import HomeAssistant
+from homeassistant.const import (
+    CONF_EVENT,
+    CONF_PORT,
+    EVENT_HOMEASSISTANT_STOP,
+    STATE_OFF,
+    STATE_UNAVAILABLE,
+)
+from homeassistant.core import CoreState, HomeAssistant
+from homeassistant.helpers import issue_registry as ir
+from homeassistant.util import dt as dt_util
+from pyasyncialarm.const import StatusType
+import pytest
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
 
 
 async def test_setup_unload_entry(
@@ -28,13 +52,42 @@ async def test_setup_unload_entry(
     assert mock_config_entry.state is ConfigEntryState.NOT_LOADED
 
 
+@pytest.mark.parametrize("restored", [False, True])
+async def test_setup_round_trips(
+    hass: HomeAssistant,
+    mock_config_entry,
+    ialarm_api,
+    hass_storage: dict[str, Any],
+    restored: bool,
+) -> None:
+    """Test setting up a panel polls it once, the entities reuse that poll."""
+    if restored:
+        storage_key = "ialarm_controller.snapshot_00_11_22_33_44_55"
+        hass_storage[storage_key] = {
+            "version": 1,
+            "key": storage_key,
+            "data": {"alarm_status": AlarmControlPanelState.DISARMED, "zones": []},
+        }
+    device = ialarm_api.return_value
+    mock_config_entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = mock_config_entry.runtime_data
+    device.get_zone_status.assert_awaited_once()
+    device.get_status.assert_awaited_once()
+    assert coordinator.poll_stats.polls == 1
+    assert coordinator.startup_fetches == {"zone_fetches": 1, "status_fetches": 1}
+
+
 async def test_setup_entry_exception(
     hass: HomeAssistant,
     mock_config_entry,
     ialarm_api,
 ) -> None:
-    """Test ConfigEntryNotReady when API raises an exception."""
-    ialarm_api.return_value.get_mac.side_effect = ConnectionError
+    """Test ConfigEntryNotReady when the first poll fails."""
+    ialarm_api.return_value.get_zone_status.side_effect = ConnectionError
 
     mock_config_entry.add_to_hass(hass)
 
@@ -49,10 +102,11 @@ async def test_setup_entry_timeout(
     mock_config_entry,
     ialarm_api,
 ) -> None:
-    """Test ConfigEntryNotReady when API times out."""
+    """Test ConfigEntryNotReady when the handshake of an entry without MAC times out."""
     ialarm_api.return_value.get_mac.side_effect = TimeoutError
 
     mock_config_entry.add_to_hass(hass)
+    hass.config_entries.async_update_entry(mock_config_entry, unique_id=None)
 
     await hass.config_entries.async_setup(mock_config_entry.entry_id)
     await hass.async_block_till_done()
@@ -86,16 +140,186 @@ async def test_update_listener(
     mock_config_entry,
     ialarm_api,
 ) -> None:
-    """Test the update listener reloads the entry."""
+    """Test options are applied live, only a new address reloads the entry."""
     ialarm_api.return_value.get_mac = AsyncMock(return_value="00:11:22:33:44:55")
     mock_config_entry.add_to_hass(hass)
 
     assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
     await hass.async_block_till_done()
+    coordinator = mock_config_entry.runtime_data
+    panel_id = "alarm_control_panel.mock_ialarm_config_entry_ialarm_panel"
+    assert hass.states.get(panel_id).attributes["code_format"] == "number"
 
     with patch(
         "homeassistant.config_entries.ConfigEntries.async_reload"
     ) as mock_reload:
-        await update_listener(hass, mock_config_entry)
+        hass.config_entries.async_update_entry(
+            mock_config_entry,
+            options={
+                CONF_EVENT: False,
+                CONF_REQUIRE_CODE_TO_ARM: False,
+                CONF_REQUIRE_CODE_TO_DISARM: False,
+                CONF_SCAN_INTERVAL_ACTIVE: 2,
+                CONF_SCAN_INTERVAL_IDLE: 120,
+            },
+        )
+        await hass.async_block_till_done()
+        mock_reload.assert_not_called()
+        assert mock_config_entry.runtime_data is coordinator
+        assert not coordinator.send_events
+        # Armed away: the active cadence applies.
+        assert coordinator.update_interval == timedelta(seconds=2)
+        assert hass.states.get(panel_id).attributes["code_format"] is None
+
+        hass.config_entries.async_update_entry(
+            mock_config_entry, data={**mock_config_entry.data, CONF_PORT: 18035}
+        )
         await hass.async_block_till_done()
         mock_reload.assert_called_once_with(mock_config_entry.entry_id)
+
+
+async def test_setup_unreachable_during_startup(
+    hass: HomeAssistant,
+    mock_config_entry,
+    ialarm_api,
+) -> None:
+    """Test a panel missing the startup budget is set up unavailable."""
+    device = ialarm_api.return_value
+    release = asyncio.Event()
+
+    async def slow_zone_status() -> list:
+        await release.wait()
+        return [{"zone_id": 1, "name": "Main Door", "types": [StatusType.ZONE_IN_USE]}]
+
+    device.get_zone_status = AsyncMock(side_effect=slow_zone_status)
+    mock_config_entry.add_to_hass(hass)
+
+    hass.set_state(CoreState.not_running)
+    with (
+        patch("custom_components.ialarm_controller.STARTUP_BUDGET", 0.01),
+        patch(
+            "custom_components.ialarm_controller.connection.async_call_later"
+        ) as call_later,
+    ):
+        assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    hass.set_state(CoreState.running)
+
+    assert mock_config_entry.state is ConfigEntryState.LOADED
+    coordinator = mock_config_entry.runtime_data
+    assert coordinator.mac == mock_config_entry.unique_id
+    assert coordinator.connection.breaker_state == IAlarmBreakerState.OPEN
+    panel_id = "alarm_control_panel.mock_ialarm_config_entry_ialarm_panel"
+    door_id = "binary_sensor.mock_ialarm_config_entry_main_door"
+    assert hass.states.get(panel_id).state == STATE_UNAVAILABLE
+    assert hass.states.get(door_id) is None
+    device.get_mac.assert_not_awaited()
+
+    # A background probe reaches the panel: it is polled, its zones added and
+    # its MAC checked.
+    release.set()
+    await call_later.call_args.args[2](dt_util.utcnow())
+    await hass.async_block_till_done()
+
+    assert coordinator.connection.breaker_state == IAlarmBreakerState.CLOSED
+    assert hass.states.get(panel_id).state == AlarmControlPanelState.ARMED_AWAY
+    assert hass.states.get(door_id).state == STATE_OFF
+    assert device.get_mac.await_count == 2
+    assert coordinator.mac_verified
+
+
+async def test_setup_mac_changed(
+    hass: HomeAssistant,
+    mock_config_entry,
+    ialarm_api,
+    issue_registry: ir.IssueRegistry,
+) -> None:
+    """Test setup skips the handshake and reports a panel with another MAC."""
+    device = ialarm_api.return_value
+    device.get_mac = AsyncMock(side_effect=ConnectionError)
+    mock_config_entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+    assert mock_config_entry.state is ConfigEntryState.LOADED
+    coordinator = mock_config_entry.runtime_data
+    assert not coordinator.mac_verified
+
+    # Checked again after the next successful poll.
+    device.get_mac = AsyncMock(return_value="AA:BB:CC:DD:EE:FF")
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert coordinator.mac_verified
+    issue = issue_registry.async_get_issue(DOMAIN, "mac_changed_00_11_22_33_44_55")
+    assert issue.translation_placeholders["found"] == "AA:BB:CC:DD:EE:FF"
+
+
+async def test_setup_restores_snapshot(
+    hass: HomeAssistant,
+    mock_config_entry,
+    ialarm_api,
+    hass_storage: dict[str, Any],
+) -> None:
+    """Test the stored snapshot is shown, flagged stale, until the panel answers."""
+    storage_key = "ialarm_controller.snapshot_00_11_22_33_44_55"
+    hass_storage[storage_key] = {
+        "version": 1,
+        "key": storage_key,
+        "data": {
+            "alarm_status": AlarmControlPanelState.ARMED_AWAY,
+            "zones": [[1, "Main Door", StatusType.ZONE_IN_USE]],
+            "saved_at": "2026-01-01T00:00:00+00:00",
+        },
+    }
+    device = ialarm_api.return_value
+    device.get_status = AsyncMock(side_effect=ConnectionError("refused"))
+    mock_config_entry.add_to_hass(hass)
+
+    with patch("custom_components.ialarm_controller.connection.async_call_later"):
+        assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+        await hass.async_block_till_done()
+
+    assert mock_config_entry.state is ConfigEntryState.LOADED
+    coordinator = mock_config_entry.runtime_data
+    assert not coordinator.last_update_success
+    panel_id = "alarm_control_panel.mock_ialarm_config_entry_ialarm_panel"
+    door_id = "binary_sensor.mock_ialarm_config_entry_main_door"
+    state = hass.states.get(panel_id)
+    assert state.state == AlarmControlPanelState.ARMED_AWAY
+    assert state.attributes["stale"] is True
+    assert hass.states.get(door_id).state == STATE_OFF
+
+    # The restored state is only shown for a bounded number of failed polls.
+    for _ in range(STALE_MAX_FAILED_POLLS - 2):
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+        assert hass.states.get(panel_id).state == AlarmControlPanelState.ARMED_AWAY
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert hass.states.get(panel_id).state == STATE_UNAVAILABLE
+    assert hass.states.get(door_id).state == STATE_UNAVAILABLE
+
+    # The first answer confirms the state, even an unchanged one, and is saved.
+    device.get_status = AsyncMock(return_value={"status_value": 0, "alarmed_zones": []})
+    device.get_zone_status = AsyncMock(
+        return_value=[
+            {"zone_id": 1, "name": "Main Door", "types": [StatusType.ZONE_IN_USE]}
+        ]
+    )
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    state = hass.states.get(panel_id)
+    assert state.state == AlarmControlPanelState.ARMED_AWAY
+    assert state.attributes["stale"] is False
+
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=SNAPSHOT_SAVE_DELAY)
+    )
+    await hass.async_block_till_done()
+    assert hass_storage[storage_key]["data"]["alarm_status"] == "armed_away"
+
+    # Once confirmed, a failing panel makes the entities unavailable again.
+    device.get_status = AsyncMock(side_effect=ConnectionError("reset"))
+    with patch("custom_components.ialarm_controller.connection.async_call_later"):
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+    assert hass.states.get(panel_id).state == STATE_UNAVAILABLE
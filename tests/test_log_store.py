@@ -0,0 +1,207 @@
+"""Test the iAlarm persistent log store."""
+
+import csv
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+from custom_components.ialarm_controller.const import DOMAIN
+from custom_components.ialarm_controller.log_store import IAlarmLogStore
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+ENTRIES = [
+    {
+        "time": datetime(2026, 3, 1, 10, 0, 0),
+        "area": 1,
+        "event": "Arming Report",
+        "name": "user",
+    },
+    {
+        "time": datetime(2026, 3, 2, 11, 0, 0),
+        "area": 1,
+        "event": "Gate magnetic switch open",
+        "name": "Main Door",
+    },
+    {
+        "time": datetime(2026, 3, 3, 12, 0, 0),
+        "area": 2,
+        "event": "Gate magnetic switch open",
+        "name": "Main Door",
+    },
+]
+
+
+async def test_log_store_query(hass: HomeAssistant) -> None:
+    """Test entries are stored once and can be filtered."""
+    store = IAlarmLogStore(hass, hass.config.path("log.db"), "panel", 100000)
+    await store.async_setup()
+    await store.async_add_entries(ENTRIES)
+    await store.async_add_entries(ENTRIES[:1])
+    await store.async_add_entries([])
+
+    items = await store.async_query()
+    assert [item["time"] for item in items] == [
+        "2026-03-03 12:00:00",
+        "2026-03-02 11:00:00",
+        "2026-03-01 10:00:00",
+    ]
+
+    items = await store.async_query(name="Main Door", area=2)
+    assert len(items) == 1
+    assert items[0]["event"] == "Gate magnetic switch open"
+
+    items = await store.async_query(
+        event="Gate magnetic switch open",
+        start_time=datetime(2026, 3, 2),
+        end_time=dt_util.as_utc(
+            datetime(2026, 3, 2, 23, 0, 0, tzinfo=dt_util.get_default_time_zone())
+        ),
+    )
+    assert [item["time"] for item in items] == ["2026-03-02 11:00:00"]
+
+    items = await store.async_query(limit=1, offset=1)
+    assert [item["time"] for item in items] == ["2026-03-02 11:00:00"]
+
+    chunks = [chunk async for chunk in store.async_iter_entries(2)]
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    chunks = [chunk async for chunk in store.async_iter_entries(3)]
+    assert [len(chunk) for chunk in chunks] == [3]
+
+    other_panel = IAlarmLogStore(hass, hass.config.path("log.db"), "other", 1)
+    await other_panel.async_setup()
+    assert await other_panel.async_query() == []
+
+
+async def test_query_log_service(
+    hass: HomeAssistant,
+    mock_config_entry,
+    ialarm_api,
+) -> None:
+    """Test synced log entries can be queried and paged through the service."""
+    ialarm_api.return_value.get_log = AsyncMock(return_value=list(reversed(ENTRIES)))
+    mock_config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = mock_config_entry.runtime_data
+    await coordinator.async_sync_log_if_dirty()
+    await coordinator.async_sync_log_if_dirty()
+    ialarm_api.return_value.get_log.assert_awaited_once()
+
+    entity_id = "alarm_control_panel.mock_ialarm_config_entry_ialarm_panel"
+    response = await hass.services.async_call(
+        DOMAIN,
+        "query_log",
+        {ATTR_ENTITY_ID: entity_id, "name": "Main Door", "limit": 1},
+        blocking=True,
+        return_response=True,
+    )
+    page = response[entity_id]
+    assert page["items"][0]["time"] == "2026-03-03 12:00:00"
+    assert page["next_offset"] == 1
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "query_log",
+        {ATTR_ENTITY_ID: entity_id, "name": "Main Door", "offset": 1},
+        blocking=True,
+        return_response=True,
+    )
+    page = response[entity_id]
+    assert [item["time"] for item in page["items"]] == ["2026-03-02 11:00:00"]
+    assert page["next_offset"] is None
+
+
+async def test_log_sync_stores_whole_delta(
+    hass: HomeAssistant,
+    mock_config_entry,
+    ialarm_api,
+) -> None:
+    """Test every entry above the cursor is stored, beyond the ring buffer size."""
+    panel_log = [
+        {
+            "time": datetime(2026, 3, 1, 10, 0, 0) + timedelta(minutes=minute),
+            "area": 1,
+            "event": "Arming Report",
+            "name": "user",
+        }
+        for minute in reversed(range(150))
+    ]
+    ialarm_api.return_value.get_log = AsyncMock(return_value=panel_log)
+    mock_config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = mock_config_entry.runtime_data
+    assert len(await coordinator.async_sync_log()) == 150
+    assert len(await coordinator.log_store.async_query(limit=500)) == 150
+    assert len((await coordinator.async_get_log(500))["items"]) == 100
+
+    # After a restart the ring buffer is empty, the store holds the cursor.
+    newest = {**panel_log[0], "time": datetime(2026, 3, 1, 13, 0, 0)}
+    ialarm_api.return_value.get_log.return_value = [newest, *panel_log]
+    coordinator._log_cache.clear()
+    assert await coordinator.async_sync_log() == [newest]
+    assert len(await coordinator.log_store.async_query(limit=500)) == 151
+    assert (await coordinator.async_get_log(500))["items"][0] == newest
+
+
+async def test_background_log_sync_failure(
+    hass: HomeAssistant,
+    mock_config_entry,
+    ialarm_api,
+) -> None:
+    """Test a failing background sync is retried on the next interval."""
+    ialarm_api.return_value.get_log = AsyncMock(side_effect=ConnectionError)
+    mock_config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = mock_config_entry.runtime_data
+    await coordinator.async_sync_log_if_dirty()
+    ialarm_api.return_value.get_log.side_effect = None
+    ialarm_api.return_value.get_log.return_value = ENTRIES
+    await coordinator.async_sync_log_if_dirty()
+    assert ialarm_api.return_value.get_log.await_count == 2
+
+
+async def test_export_log_service(
+    hass: HomeAssistant,
+    mock_config_entry,
+    ialarm_api,
+) -> None:
+    """Test the stored log is exported to a CSV file, even when the panel is down."""
+    ialarm_api.return_value.get_log = AsyncMock(return_value=list(reversed(ENTRIES)))
+    mock_config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity_id = "alarm_control_panel.mock_ialarm_config_entry_ialarm_panel"
+    response = await hass.services.async_call(
+        DOMAIN,
+        "export_log",
+        {ATTR_ENTITY_ID: entity_id, "name": "Main Door"},
+        blocking=True,
+        return_response=True,
+    )
+    result = response[entity_id]
+    assert result["entries"] == 2
+    assert Path(result["path"]).parent == Path(hass.config.config_dir)
+    with Path(result["path"]).open(encoding="utf-8") as csv_file:
+        rows = list(csv.DictReader(csv_file))
+    assert [row["time"] for row in rows] == [
+        "2026-03-03 12:00:00",
+        "2026-03-02 11:00:00",
+    ]
+
+    ialarm_api.return_value.get_log.side_effect = ConnectionError
+    response = await hass.services.async_call(
+        DOMAIN,
+        "export_log",
+        {ATTR_ENTITY_ID: entity_id},
+        blocking=True,
+        return_response=True,
+    )
+    assert response[entity_id]["entries"] == 3
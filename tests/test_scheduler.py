@@ -0,0 +1,135 @@
+"""Test the domain-wide poll scheduler."""
+
+import asyncio
+from datetime import datetime, timedelta
+import inspect
+import logging
+from unittest.mock import Mock, patch
+
+from custom_components.ialarm_controller.const import DOMAIN
+from custom_components.ialarm_controller.coordinator import _BASE_REFRESH_INTERNALS
+from custom_components.ialarm_controller.scheduler import (
+    IAlarmPollScheduler,
+    async_get_poll_scheduler,
+)
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+
+async def test_phase_grid(hass: HomeAssistant) -> None:
+    """Test panels get evenly spread, stable slots and grid aligned refreshes."""
+    scheduler = IAlarmPollScheduler(hass)
+    panels = [Mock() for _ in range(4)]
+    unregister = [scheduler.async_register(panel) for panel in panels]
+    assert [scheduler.phase(panel) for panel in panels] == [0, 0.5, 0.25, 0.75]
+
+    # A freed slot is handed to the next panel, the others keep theirs.
+    unregister[1]()
+    late = Mock()
+    scheduler.async_register(late)
+    assert scheduler.phase(late) == 0.5
+    assert scheduler.phase(panels[3]) == 0.75
+
+    with patch.object(hass.loop, "time", return_value=1001.0):
+        assert scheduler.async_next_refresh(panels[0], 10) == 1010
+        assert scheduler.async_next_refresh(late, 10) == 1015
+        assert scheduler.async_next_refresh(panels[2], 10) == 1012.5
+    with patch.object(hass.loop, "time", return_value=1007.6):
+        # The grid point 2.5 s away is too close after an off-grid refresh.
+        assert scheduler.async_next_refresh(panels[3], 10) == 1017.5
+
+
+async def test_poll_concurrency_limit(hass: HomeAssistant) -> None:
+    """Test scheduled polls beyond the limit wait for a free slot."""
+    scheduler = IAlarmPollScheduler(hass, max_concurrent=1)
+    release = asyncio.Event()
+    order = []
+
+    async def poll(name: str) -> None:
+        async with scheduler.async_poll_slot():
+            order.append(name)
+            await release.wait()
+
+    first = hass.async_create_task(poll("first"))
+    second = hass.async_create_task(poll("second"))
+    await asyncio.sleep(0)
+    assert order == ["first"]
+    release.set()
+    await asyncio.gather(first, second)
+    assert order == ["first", "second"]
+    assert scheduler.polls_delayed == 1
+
+
+async def test_poll_schedule_service(
+    hass: HomeAssistant,
+    mock_config_entry,
+    ialarm_api,
+) -> None:
+    """Test the coordinator polls on its grid slot and the schedule is exposed."""
+    mock_config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = mock_config_entry.runtime_data
+    scheduler = async_get_poll_scheduler(hass)
+    assert coordinator.scheduler is scheduler
+    interval = coordinator.update_interval.total_seconds()
+    next_refresh = scheduler._next_refresh[coordinator]
+    assert next_refresh % interval == 0
+
+    entity_id = "alarm_control_panel.mock_ialarm_config_entry_ialarm_panel"
+    response = await hass.services.async_call(
+        DOMAIN,
+        "get_poll_schedule",
+        {ATTR_ENTITY_ID: entity_id},
+        blocking=True,
+        return_response=True,
+    )
+    schedule = response[entity_id]
+    assert schedule["polls_delayed"] == 0
+    assert schedule["polls"] == [
+        {
+            "host": coordinator.host,
+            "mac": coordinator.mac,
+            "slot": 0,
+            "phase": 0,
+            "interval": interval,
+            "next_refresh": schedule["polls"][0]["next_refresh"],
+        }
+    ]
+    # The response is JSON: the next refresh is an ISO 8601 string.
+    assert datetime.fromisoformat(schedule["polls"][0]["next_refresh"]).tzinfo
+
+    # The scheduled refresh runs through the scheduler.
+    coordinator._async_unsub_refresh()
+    with patch.object(
+        scheduler, "async_poll_slot", wraps=scheduler.async_poll_slot
+    ) as poll_slot:
+        coordinator._async_start_scheduled_refresh(
+            scheduler, coordinator._handle_refresh_interval
+        )
+        await hass.async_block_till_done()
+    poll_slot.assert_called_once()
+
+    await hass.config_entries.async_unload(mock_config_entry.entry_id)
+    assert scheduler.async_schedule() == []
+
+
+async def test_base_refresh_internals(hass: HomeAssistant) -> None:
+    """Test the DataUpdateCoordinator internals the scheduler hooks into exist.
+
+    A Home Assistant release renaming them must fail here rather than
+    silently falling back to the default refresh timer.
+    """
+    coordinator = DataUpdateCoordinator(
+        hass,
+        logging.getLogger(__name__),
+        name="test",
+        update_interval=timedelta(seconds=10),
+    )
+    for name in _BASE_REFRESH_INTERNALS:
+        assert hasattr(coordinator, name), name
+    assert coordinator._update_interval_seconds == 10
+    assert callable(coordinator._async_unsub_refresh)
+    assert inspect.iscoroutinefunction(coordinator._handle_refresh_interval)
@@ -1,10 +1,18 @@
 """Test the iAlarm sensor."""
 
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, patch
 
+from custom_components.ialarm_controller.const import (
+    LINK_QUALITY_WINDOW,
+    IAlarmStatusSnapshot,
+)
+from custom_components.ialarm_controller.coordinator import IAlarmLinkQuality
 from custom_components.ialarm_controller.sensor import IAlarmSensorEntity
+from homeassistant.components.alarm_control_panel import AlarmControlPanelState
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
 from pyasyncialarm.const import StatusType
+import pytest
 
 
 async def test_sensor_triggered_and_anomaly(
@@ -170,15 +178,91 @@ async def test_sensor_coordinator_update(
     coordinator = mock_config_entry.runtime_data
 
     # Update coordinator data and trigger update
-    coordinator.data = {
-        "ialarm_status": "armed_away",
-        "zone_status_list": [
-            {"zone_id": 1, "name": "Zone 1", "types": [StatusType.ZONE_ALARM]}
-        ],
-    }
-    coordinator.async_set_updated_data(coordinator.data)
+    coordinator.async_set_updated_data(
+        IAlarmStatusSnapshot.from_zone_status(
+            AlarmControlPanelState.ARMED_AWAY,
+            [{"zone_id": 1, "name": "Zone 1", "types": [StatusType.ZONE_ALARM]}],
+        )
+    )
     await hass.async_block_till_done()
 
     state = hass.states.get(entity_id)
     assert state.state == "triggered"
     assert "Zone 1 (Zone 1)" in state.attributes
+
+
+async def test_link_quality_sensors_disabled_by_default(
+    hass: HomeAssistant,
+    mock_config_entry,
+    ialarm_api,
+) -> None:
+    """Test only the poll success rate is enabled, the others write every poll."""
+    mock_config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert hass.states.get("sensor.mock_ialarm_config_entry_poll_success_rate")
+    entity_registry = er.async_get(hass)
+    for entity_id in (
+        "sensor.mock_ialarm_config_entry_round_trip_time",
+        "sensor.mock_ialarm_config_entry_jitter",
+        "sensor.mock_ialarm_config_entry_last_successful_update",
+    ):
+        assert hass.states.get(entity_id) is None
+        entry = entity_registry.async_get(entity_id)
+        assert entry.disabled_by is er.RegistryEntryDisabler.INTEGRATION
+
+
+@pytest.mark.usefixtures("entity_registry_enabled_by_default")
+async def test_link_quality_sensors(
+    hass: HomeAssistant,
+    mock_config_entry,
+    ialarm_api,
+) -> None:
+    """Test the link quality sensors follow every poll, unchanged ones included."""
+    mock_config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = mock_config_entry.runtime_data
+    rtt_id = "sensor.mock_ialarm_config_entry_round_trip_time"
+    rate_id = "sensor.mock_ialarm_config_entry_poll_success_rate"
+    last_id = "sensor.mock_ialarm_config_entry_last_successful_update"
+    assert float(hass.states.get(rtt_id).state) >= 0
+    # The round trip is the one measured for the get_status exchange itself,
+    # whatever other exchange was captured meanwhile.
+    with patch.object(
+        coordinator.connection,
+        "async_call_timed",
+        AsyncMock(return_value=({"status_value": 0, "alarmed_zones": []}, 0.123)),
+    ):
+        await coordinator._async_fetch_status([])
+    assert coordinator.link_quality._last_rtt == pytest.approx(123)
+    assert hass.states.get("sensor.mock_ialarm_config_entry_jitter").state == "0.0"
+    assert hass.states.get(rate_id).state == "100.0"
+    last_success = hass.states.get(last_id).state
+
+    # A failed poll lowers the success rate and keeps the last success time.
+    ialarm_api.return_value.get_status = AsyncMock(side_effect=ConnectionError)
+    with patch("custom_components.ialarm_controller.connection.async_call_later"):
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+    assert hass.states.get(rate_id).state == "50.0"
+    assert hass.states.get(last_id).state == last_success
+
+
+def test_link_quality_smoothing() -> None:
+    """Test the round-trip time and jitter smoothing and the sliding window."""
+    link = IAlarmLinkQuality()
+    assert link.success_rate is None
+    link.record_rtt(0.1)
+    assert (link.rtt, link.jitter) == (100, 0)
+    link.record_rtt(0.26)
+    assert link.rtt == pytest.approx(120)
+    assert link.jitter == pytest.approx(10)
+
+    link.record_poll(False)
+    for _ in range(LINK_QUALITY_WINDOW):
+        link.record_poll(True)
+    # The failure slid out of the window.
+    assert link.success_rate == 100